@@ -0,0 +1,276 @@
+"""Page aggregates computed from roku_summary, with no Streamlit dependency.
+
+Every chart and table in the app is a rollup of the roku_summary frame returned
+by DatabaseManager.get_roku_summary(). The functions here take that frame and
+return plain pandas objects; the views render them and the CLI writes them to
+Parquet or JSON so they can be precomputed in a batch job.
+
+Usage:
+    python analytics.py --year 2025 --month 3 --out results
+    python analytics.py --year 2023 2024 2025 --format json
+    python analytics.py --from 2025-01-01 --to 2025-06-30
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+import calendar_dim
+from database import DatabaseManager
+
+# Statistical page period choices and the column each one groups by
+PERIOD_COLUMNS = {'Weekly': 'Week', 'Monthly': 'Month', 'Quarterly': 'Quarter', 'Half-Yearly': 'HalfYear'}
+# Period columns added to frames and the calendar_dim column each one comes from
+PERIOD_SOURCES = {'Week': 'week_number', 'WeekYear': 'week_year', 'Month': 'month', 'Quarter': 'quarter',
+                  'HalfYear': 'half_year', 'Year': 'year'}
+
+
+def month_bounds(year, month):
+    """First and last day of the given month"""
+    month_start = pd.Timestamp(year=year, month=month, day=1)
+    return month_start, month_start + pd.offsets.MonthEnd(0)
+
+
+def add_period_columns(df):
+    """Add Week/Month/Quarter/HalfYear/Year columns for reportdate from the calendar dimension"""
+    periods = calendar_dim.lookup(df['reportdate'])
+    for column, source in PERIOD_SOURCES.items():
+        df[column] = periods[source].to_numpy()
+    return df
+
+
+def monthly_weekly_revenue(summary):
+    """Monthly Revenue page: weeks of one month numbered 1..n with their totals"""
+    if summary.empty:
+        return pd.DataFrame()
+    # Sunday-to-Saturday week starts are precomputed in roku_summary
+    weekly_data = summary.groupby('week_start').agg({
+        'amount': 'sum',
+        'qty': 'sum'
+    }).reset_index()
+    weekly_data['week_end'] = calendar_dim.lookup(weekly_data['week_start'], ['week_end'])['week_end']
+    # Weeks of the month, 1..n
+    weekly_data['week_number'] = range(1, len(weekly_data) + 1)
+    weekly_data['total_amount'] = weekly_data['amount'].round(2)
+    weekly_data['total_quantity'] = weekly_data['qty'].astype(int)
+    return weekly_data.drop(columns=['amount', 'qty']).sort_values('week_start')
+
+
+def weekly_revenue_comparison(summary):
+    """Weekly Revenue page: weeks numbered by the calendar, with week-over-week change"""
+    if summary.empty:
+        return pd.DataFrame()
+    weekly_data = summary.groupby('week_start').agg({
+        'amount': 'sum',
+        'qty': 'sum'
+    }).reset_index().sort_values('week_start')
+    weeks = calendar_dim.lookup(weekly_data['week_start'], ['week_end', 'week_number'])
+    weekly_data.insert(0, 'week_number', weeks['week_number'])
+    weekly_data.insert(2, 'week_end', weeks['week_end'])
+    weekly_data['total_amount'] = weekly_data['amount'].round(2)
+    weekly_data['total_quantity'] = weekly_data['qty'].astype(int)
+    previous = weekly_data['total_amount'].shift(1)
+    weekly_data['pct_change'] = ((weekly_data['total_amount'] - previous) / previous.where(previous != 0) * 100).round(1)
+    return weekly_data.drop(columns=['amount', 'qty']).reset_index(drop=True)
+
+
+def week_over_week(weekly_data, previous_weekly=None):
+    """Weekly Revenue rows with the prior week's amount and the change against it.
+
+    The first week of a month is compared with the last earlier week of
+    previous_weekly (the previous month's weekly_revenue_comparison), so the
+    month boundary and the year boundary are handled like any other week.
+    pct_change is NaN when there is no prior week or it took nothing.
+    """
+    if weekly_data.empty:
+        return weekly_data
+    combined = weekly_data.reset_index(drop=True)
+    prior_rows = 0
+    if previous_weekly is not None and not previous_weekly.empty:
+        prior = previous_weekly[previous_weekly['week_start'] < combined['week_start'].min()].tail(1)
+        prior_rows = len(prior)
+        if prior_rows:
+            combined = pd.concat([prior, combined], ignore_index=True)
+
+    combined['prev_amount'] = combined['total_amount'].shift(1)
+    combined['change_amount'] = (combined['total_amount'] - combined['prev_amount']).round(2)
+    prev_amount = combined['prev_amount'].where(combined['prev_amount'] != 0)
+    combined['pct_change'] = (combined['change_amount'] / prev_amount * 100).round(1)
+    return combined.iloc[prior_rows:].reset_index(drop=True)
+
+
+def service_weekly_metrics(summary):
+    """Weekly Services page: qty and amount per servicecode and week"""
+    weekly_metrics = summary.groupby(['servicecode', 'week_start'], observed=True).agg({
+        'qty': 'sum',
+        'amount': 'sum'
+    }).reset_index()
+    weekly_metrics.columns = ['servicecode', 'WeekStart', 'qty', 'amount']
+    weekly_metrics['qty'] = weekly_metrics['qty'].astype(int)
+    weekly_metrics['amount'] = weekly_metrics['amount'].round(2)
+    return weekly_metrics
+
+
+def period_totals(summary, period_column):
+    """Statistical page: qty and amount per servicecode for each Week/Month/Quarter/HalfYear"""
+    periods = add_period_columns(summary.copy())
+    grouped = periods.groupby([period_column, 'servicecode'], observed=True).agg({
+        'qty': 'sum',
+        'amount': 'sum'
+    }).reset_index()
+    grouped['qty'] = grouped['qty'].astype(int)
+    grouped['amount'] = grouped['amount'].round(2)
+    return grouped
+
+
+def model_analysis(summary):
+    """Analysis page: every statistic shown, keyed by name.
+
+    The summary is reduced once per dimension (Model, servicecode, day and
+    day x Model); rankings, averages, trends and calendar rollups are then
+    selections on those small frames instead of a dozen passes over the rows.
+    """
+    by_model = summary.groupby("Model", observed=True)[["qty", "amount", "rate_sum", "row_count"]].sum()
+    by_service = summary.groupby("servicecode", observed=True)[["amount", "row_count"]].sum()
+    by_day = summary.groupby("reportdate")[["qty", "amount"]].sum()
+    by_day_model = summary.groupby(["reportdate", "Model"], observed=True)["row_count"].sum().reset_index()
+
+    # Calendar columns are looked up per day x Model, not per summary row
+    calendar = add_period_columns(by_day_model)
+    # A week belongs to the year of its Sunday, even for its days in January
+    weekly_model = (calendar.groupby(["WeekYear", "Week", "Model"], observed=True)["row_count"].sum()
+                    .reset_index(name='count').rename(columns={"WeekYear": "Year"}))
+    monthly_model = calendar.groupby(["Year", "Month", "Model"], observed=True)["row_count"].sum().reset_index(name='count')
+    quarterly_model = calendar.groupby(["Year", "Quarter", "Model"], observed=True)["row_count"].sum().reset_index(name='count')
+
+    model_qty = by_model["qty"]
+    model_amount = by_model["amount"].round(2)
+    amount_desc = model_amount.sort_values(ascending=False)
+    total_records = int(by_model["row_count"].sum())
+    return {
+        'total_records': total_records,
+        'total_revenue': by_model["amount"].sum().round(2),
+        'total_qty': model_qty.sum(),
+        'avg_rate': (by_model["rate_sum"].sum() / total_records).round(2),
+        'top_qty': model_qty.sort_values(ascending=False).head(3),
+        'top_amount': amount_desc.head(3),
+        'bottom_qty': model_qty.sort_values(ascending=True).head(3),
+        'bottom_amount': model_amount.sort_values(ascending=True).head(3),
+        'revenue_trend': by_day["amount"].round(2),
+        'qty_trend': by_day["qty"],
+        'freq_service': by_service["row_count"].sort_values(ascending=False).head(10),
+        'revenue_service': by_service["amount"].sort_values(ascending=False).round(2).head(10),
+        'model_avg_rate': (by_model["rate_sum"] / by_model["row_count"]).round(2).rename("rate"),
+        'top10_weekly_model': weekly_model.sort_values(by="count", ascending=False).head(10),
+        'top10_monthly_model': monthly_model.sort_values(by='count', ascending=False).head(10),
+        'quarterly_model': quarterly_model,
+        'revenue_share': amount_desc.head(10),
+    }
+
+
+def compute_all(summary, year=None, month=None):
+    """Every page's aggregates for one summary slice, keyed by page then result name"""
+    results = {
+        'weekly_services': {'metrics': service_weekly_metrics(summary)},
+        'statistical': {column: period_totals(summary, column) for column in PERIOD_COLUMNS.values()},
+        'analysis': model_analysis(summary) if not summary.empty else {},
+    }
+    if year is not None and month is not None:
+        results['monthly_revenue'] = {'weeks': monthly_weekly_revenue(summary)}
+        results['weekly_revenue'] = {'weeks': weekly_revenue_comparison(summary)}
+    return results
+
+
+def slice_summary(summary, from_date, to_date):
+    """Rows of an already-loaded summary with reportdate between from_date and to_date (inclusive)"""
+    dates = summary['reportdate']
+    mask = (dates >= pd.Timestamp(from_date)) & (dates < pd.Timestamp(to_date) + pd.Timedelta(days=1))
+    return summary[mask]
+
+
+def _as_frame(value):
+    """Series and frames as a flat DataFrame with their index as columns"""
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    if not isinstance(value.index, pd.RangeIndex):
+        value = value.reset_index()
+    # Parquet wants string column names; categoricals are written as plain values
+    value.columns = [str(col) for col in value.columns]
+    return value.astype({col: str(value[col].cat.categories.dtype) for col in value.select_dtypes('category')})
+
+
+def write_results(results, out_dir, fmt='parquet'):
+    """Write each table to <out_dir>/<page>/<name>.<fmt> and scalars to <out_dir>/<page>/scalars.json"""
+    written = []
+    for page, tables in results.items():
+        page_dir = os.path.join(out_dir, page)
+        os.makedirs(page_dir, exist_ok=True)
+        scalars = {}
+        for name, value in tables.items():
+            if not isinstance(value, (pd.DataFrame, pd.Series)):
+                scalars[name] = value.item() if hasattr(value, 'item') else value
+                continue
+            frame = _as_frame(value)
+            path = os.path.join(page_dir, f'{name}.{fmt}')
+            if fmt == 'parquet':
+                frame.to_parquet(path, index=False)
+            else:
+                frame.to_json(path, orient='records', date_format='iso', indent=2)
+            written.append(path)
+        if scalars:
+            path = os.path.join(page_dir, 'scalars.json')
+            with open(path, 'w') as f:
+                json.dump(scalars, f, indent=2)
+            written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute page aggregates from roku_summary without Streamlit")
+    parser.add_argument('--db', default='mycontec.db', help="SQLite database (default: mycontec.db)")
+    parser.add_argument('--year', type=int, nargs='+', help="year(s) to compute; every month plus the full year")
+    parser.add_argument('--month', type=int, nargs='+', help="restrict --year to these months")
+    parser.add_argument('--from', dest='from_date', help="start of an explicit date range (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='to_date', help="end of an explicit date range (YYYY-MM-DD, inclusive)")
+    parser.add_argument('--out', default='analytics_output', help="output directory (default: analytics_output)")
+    parser.add_argument('--format', choices=['parquet', 'json'], default='parquet')
+    args = parser.parse_args(argv)
+
+    if not args.year and not (args.from_date and args.to_date):
+        parser.error("give --year (optionally with --month) or both --from and --to")
+    if args.month and not args.year:
+        parser.error("--month needs --year")
+
+    started = time.perf_counter()
+    db_manager = DatabaseManager(args.db)
+
+    # Each slice is cut from one summary load, so many years cost a single query
+    jobs = []
+    if args.year:
+        summary = db_manager.get_roku_summary(pd.Timestamp(year=min(args.year), month=1, day=1),
+                                              pd.Timestamp(year=max(args.year), month=12, day=31))
+        for year in args.year:
+            for month in args.month or range(1, 13):
+                from_date, to_date = month_bounds(year, month)
+                jobs.append((f'{year}-{month:02d}', slice_summary(summary, from_date, to_date), year, month))
+            if not args.month:
+                jobs.append((str(year), slice_summary(summary, f'{year}-01-01', f'{year}-12-31'), None, None))
+    if args.from_date and args.to_date:
+        summary = db_manager.get_roku_summary(args.from_date, args.to_date)
+        label = f'{pd.Timestamp(args.from_date):%Y-%m-%d}_{pd.Timestamp(args.to_date):%Y-%m-%d}'
+        jobs.append((label, summary, None, None))
+
+    files = 0
+    for label, summary, year, month in jobs:
+        written = write_results(compute_all(summary, year, month), os.path.join(args.out, label), args.format)
+        files += len(written)
+        print(f"{label}: {len(summary):,} summary rows, {len(written)} files")
+    print(f"Wrote {files} files for {len(jobs)} slices to {args.out} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
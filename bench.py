@@ -0,0 +1,167 @@
+"""Per-page compute benchmarks against one or more roku databases.
+
+Times each page's data path headlessly (no Streamlit, no caches) and records
+wall time and peak Python memory via tracemalloc. The JSON report is meant to
+be committed or archived and diffed between versions with --compare.
+
+Usage:
+    python synth.py 100k 1M
+    python bench.py bench_data/synth_100k.db bench_data/synth_1M.db --out bench_report.json
+    python bench.py bench_data/synth_1M.db --compare bench_report.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import analytics
+from database import DatabaseManager
+from snapshot import ColumnarSnapshot
+
+
+def _latest_month(db_manager):
+    conn = db_manager.get_connection()
+    try:
+        latest = conn.execute('SELECT MAX(reportdate) FROM roku_summary').fetchone()[0]
+    finally:
+        conn.close()
+    latest = pd.Timestamp(latest) if latest else pd.Timestamp.today()
+    return latest.year, latest.month
+
+
+def page_cases(db_manager):
+    """(name, callable) for every page compute path, in page order"""
+    year, month = _latest_month(db_manager)
+    summary = db_manager.get_roku_summary()
+
+    cases = [
+        # SQLite every time, rather than the snapshot the first run would write
+        ('get_roku_data', lambda: db_manager.get_roku_data(use_snapshot=False)),
+        ('get_roku_summary', lambda: db_manager.get_roku_summary()),
+        ('alfa.fetch_weekly_data', lambda: analytics.monthly_weekly_revenue(
+            db_manager.get_roku_summary(*analytics.month_bounds(year, month)))),
+        ('beta.fetch_weekly_data', lambda: analytics.weekly_revenue_comparison(
+            db_manager.get_roku_summary(*analytics.month_bounds(year, month)))),
+        ('charlie.calculate_metrics', lambda: analytics.service_weekly_metrics(summary)),
+    ]
+    for label, column in analytics.PERIOD_COLUMNS.items():
+        cases.append((f'delta.period_totals[{label}]',
+                      lambda column=column: analytics.period_totals(summary, column)))
+    cases.append(('echo.model_analysis', lambda: analytics.model_analysis(summary)))
+    return cases
+
+
+def measure(func, repeat=3):
+    """Wall time over `repeat` runs and peak traced memory of one run"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds_median': round(statistics.median(timings), 4),
+        'seconds_min': round(min(timings), 4),
+        'peak_mb': round(peak / 1024 / 1024, 2),
+    }
+
+
+def bench_database(path, repeat=3, report=print):
+    db_manager = DatabaseManager(path)
+    conn = db_manager.get_connection()
+    try:
+        rows = conn.execute('SELECT COUNT(*) FROM roku_data').fetchone()[0]
+        summary_rows = conn.execute('SELECT COUNT(*) FROM roku_summary').fetchone()[0]
+    finally:
+        conn.close()
+
+    result = {'rows': rows, 'summary_rows': summary_rows, 'cases': {}}
+    # Written to a scratch directory, so benchmarking leaves nothing next to the database
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        snapshot = ColumnarSnapshot(os.path.join(directory, 'bench'))
+        df = db_manager.get_roku_data(use_snapshot=False)
+        snapshot.write(df, df.attrs['rewrite_generation'])
+        del df
+        cases = page_cases(db_manager) + [('snapshot.load', lambda: snapshot.load())]
+        for name, func in cases:
+            result['cases'][name] = stats = measure(func, repeat)
+            report(f"{path} {name:<36} {stats['seconds_median']:>9.4f}s {stats['peak_mb']:>10.1f} MB")
+    return result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, report=print):
+    """Print median time and peak memory ratios for cases present in both reports"""
+    for path, result in current['databases'].items():
+        old = baseline.get('databases', {}).get(path)
+        if old is None:
+            report(f"{path}: not in baseline")
+            continue
+        for name, stats in result['cases'].items():
+            before = old['cases'].get(name)
+            if before is None:
+                continue
+            time_ratio = stats['seconds_median'] / before['seconds_median'] if before['seconds_median'] else float('inf')
+            memory_ratio = stats['peak_mb'] / before['peak_mb'] if before['peak_mb'] else float('inf')
+            report(f"{path} {name:<36} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each page's compute path")
+    parser.add_argument('databases', nargs='+', help="databases to benchmark, e.g. from synth.py")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case (median reported)")
+    parser.add_argument('--out', default='bench_report.json', help="JSON report path")
+    parser.add_argument('--compare', help="earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        # Read first: --out may name the same file
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'sqlite': sqlite3.sqlite_version,
+        'repeat': args.repeat,
+        'databases': {},
+    }
+    for path in args.databases:
+        report['databases'][path] = bench_database(path, args.repeat)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+    if baseline is not None:
+        compare(report, baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Process-wide caches shared by every Streamlit session and rerun.
+
+roku.py is re-executed from the top on every rerun, so caches defined there are
+rebuilt each time and almost never hit. This module is imported once per
+process and keeps its state for as long as the server runs.
+"""
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+# roku_data only changes by appending (a higher contec_id) or through an UPDATE or
+# DELETE, which the roku_meta triggers count (database.create_change_tracking)
+CHANGE_TOKEN_SQL = ("SELECT (SELECT value FROM roku_meta WHERE key = 'rewrite_generation'), "
+                    "(SELECT MAX(contec_id) FROM roku_data)")
+
+
+class DatasetCache:
+    """Loaded datasets keyed by (database, loader key), invalidated when the data changes.
+
+    Validity is checked against a roku_data change token read on a dedicated
+    probe connection, and only re-read when SQLite's PRAGMA data_version shows
+    another connection, in this process or another, has committed. Commits
+    that leave roku_data alone, such as logins and session rotation, keep
+    every entry. There is no wall-clock expiry, so fresh data is visible on the next rerun after it lands. Loaders
+    that can apply just the change pass a refresh function to get(), and ones
+    that serve data from outside SQLite (the published snapshot) pass a
+    source_version function, since publishing commits nothing to the database.
+
+    Bounded like AggregateCache by the total size of the stored datasets,
+    least recently used first, except that the newest dataset is always kept
+    even if it alone is over the limit: a page reruns against it constantly.
+    """
+
+    def __init__(self, max_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._probes = {}
+        # cache_key -> [lock, callers holding or waiting for it]; dropped when idle
+        self._key_locks = {}
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def data_version(self, db_name):
+        """Token that changes whenever roku_data in db_name changes"""
+        with self._lock:
+            probe = self._probes.get(db_name)
+            if probe is None:
+                # [connection, PRAGMA data_version last seen, change token at that point]
+                probe = self._probes[db_name] = [sqlite3.connect(db_name, check_same_thread=False), None, None]
+            conn = probe[0]
+            commits = conn.execute('PRAGMA data_version').fetchone()[0]
+            if commits != probe[1]:
+                probe[1:] = [commits, conn.execute(CHANGE_TOKEN_SQL).fetchone()]
+            return probe[2]
+
+    def get(self, db_name, key, loader, refresh=None, source_version=None):
+        """Return the cached value for key, calling loader() if missing or stale.
+
+        When the entry is stale, refresh(old_value) is tried first if given: it
+        returns the updated value (e.g. with newly appended rows), or None when
+        only a full reload will do. source_version() is compared along with the
+        database's version, so the entry is also stale once it changes.
+        """
+        cache_key = (db_name, key)
+        with self._lock:
+            key_lock = self._key_locks.get(cache_key)
+            if key_lock is None:
+                key_lock = self._key_locks[cache_key] = [threading.Lock(), 0]
+            key_lock[1] += 1
+
+        # One loader per key at a time; concurrent sessions wait and then hit
+        try:
+            with key_lock[0]:
+                return self._get(db_name, cache_key, loader, refresh, source_version)
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[cache_key]
+
+    def _get(self, db_name, cache_key, loader, refresh, source_version):
+        version = self.data_version(db_name)
+        if source_version is not None:
+            # Read before loading, so a version published mid-load makes the entry stale
+            version = (version, source_version())
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self.invalidations += 1
+            self.misses += 1
+
+        value = None
+        if entry is not None and refresh is not None:
+            value = refresh(entry[1])
+            if value is not None:
+                with self._lock:
+                    self.refreshes += 1
+        if value is None:
+            value = loader()
+
+        # Empty results are not kept, so a failed load is retried on the next rerun
+        if getattr(value, 'empty', False):
+            return value
+        size = _result_bytes(value)
+        with self._lock:
+            if cache_key in self._entries:
+                self.total_bytes -= self._entries.pop(cache_key)[2]
+            self._entries[cache_key] = (version, value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+                self.evicted_bytes += evicted_size
+        return value
+
+    def clear(self):
+        """Drop every cached dataset"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters for display or logging"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'refreshes': self.refreshes,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared by all sessions in this server process
+dataset_cache = DatasetCache()
+
+
+def _result_bytes(value):
+    """Approximate in-memory size of a computed aggregate"""
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_result_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_result_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class AggregateCache:
+    """Computed page aggregates keyed by (page, parameters, data version).
+
+    Bounded by the total size of the stored results rather than entry count;
+    least recently used results are evicted first. Including the data version
+    in the key means results for old data simply age out.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.oversized = 0
+
+    def get(self, page, params, version, compute):
+        """Return the cached result for (page, params, version), calling compute() on a miss"""
+        key = (page, params, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        size = _result_bytes(value)
+
+        with self._lock:
+            if size > self.max_bytes:
+                # Never let one result flush the whole cache
+                self.oversized += 1
+                return value
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+                self.evicted_bytes += evicted_size
+        return value
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Hit/miss and eviction counters for display or logging"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+                'oversized': self.oversized,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+aggregate_cache = AggregateCache()
@@ -0,0 +1,59 @@
+"""Date-keyed calendar dimension: Sunday-to-Saturday weeks and fiscal periods.
+
+Every page takes its periods from here instead of deriving them with its own
+weekday arithmetic. Weeks run Sunday to Saturday and are numbered within
+week_year, the year of their Sunday (week 1 starts on the year's first
+Sunday), so a week spanning New Year keeps a single number. The fiscal year
+is the calendar year, so quarters and halves follow the calendar months.
+
+The frame is built once per process and looked up by date. SQL has no copy:
+roku_summary stores each row's week_start, computed with the same rule by
+database.week_start_sql.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+CALENDAR_START = '2000-01-01'
+CALENDAR_END = '2100-12-31'
+CALENDAR_COLUMNS = ['week_start', 'week_end', 'week_number', 'week_year', 'month', 'quarter', 'half_year', 'year']
+
+
+def build_calendar(start=CALENDAR_START, end=CALENDAR_END):
+    """One row per day from start to end, indexed by date"""
+    dates = pd.date_range(start, end, freq='D', name='date')
+    # Days since the preceding Sunday (Sunday = 0)
+    offset = (dates.dayofweek + 1) % 7
+    week_start = dates - pd.to_timedelta(offset, unit='D')
+    jan_first = pd.to_datetime(pd.DataFrame({'year': week_start.year, 'month': 1, 'day': 1}))
+    first_sunday = jan_first + pd.to_timedelta((6 - jan_first.dt.dayofweek) % 7, unit='D')
+    week_number = (week_start - pd.DatetimeIndex(first_sunday)).days // 7 + 1
+    return pd.DataFrame({
+        'week_start': week_start,
+        'week_end': week_start + pd.Timedelta(days=6),
+        'week_number': np.asarray(week_number, dtype=np.int16),
+        'week_year': np.asarray(week_start.year, dtype=np.int16),
+        'month': np.asarray(dates.month, dtype=np.int8),
+        'quarter': np.asarray(dates.quarter, dtype=np.int8),
+        'half_year': np.asarray((dates.month - 1) // 6 + 1, dtype=np.int8),
+        'year': np.asarray(dates.year, dtype=np.int16),
+    }, index=dates)
+
+
+@lru_cache(maxsize=1)
+def get_calendar():
+    """The process-wide calendar for CALENDAR_START..CALENDAR_END"""
+    return build_calendar()
+
+
+def lookup(dates, columns=None):
+    """Calendar attributes for a Series of dates, aligned to its index"""
+    calendar = get_calendar()
+    days = pd.DatetimeIndex(pd.to_datetime(dates)).normalize()
+    if len(days) and (days.min() < calendar.index[0] or days.max() > calendar.index[-1]):
+        # Outside the cached span: build just the range needed
+        calendar = build_calendar(min(days.min(), calendar.index[0]), max(days.max(), calendar.index[-1]))
+    result = calendar[columns or CALENDAR_COLUMNS].reindex(days)
+    result.index = dates.index
+    return result
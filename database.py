@@ -0,0 +1,826 @@
+"""SQLite storage for the Contec Roku app: schema, migrations and typed loaders.
+
+Kept free of Streamlit so the ingestion command and other headless tools can
+share the same schema bootstrap and queries as the web app.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+import pandas as pd
+import bcrypt
+
+import perf
+from querylog import InstrumentedCursor, query_log
+from snapshot import ColumnarSnapshot
+
+## database setup with SQLite
+# Schema versions recorded in PRAGMA user_version:
+#   1 - base tables, admin user, ISO-8601 dates and numeric qty/amount/rate
+#   2 - trigger-maintained roku_summary table
+#   3 - idx_tracking_invoice for ingestion duplicate checks
+#   4 - roku_calendar date dimension (dropped again in 10)
+#   5 - roku_meta rewrite generation for incremental reloads
+#   6 - NULL instead of 'NaN'/'None' placeholder text in optional columns
+#   7 - session_codes and users.session_generation for revocable login sessions
+#   8 - triggers rejecting reportdate values that are not ISO-8601 dates
+#   9 - non-padded M/D/YYYY dates the first date rewrite skipped
+#  10 - roku_calendar removed; periods come from calendar_dim in Python
+SCHEMA_VERSION = 10
+
+# ROKU_SNAPSHOT=shared: workers only map the snapshot a `snapshot.py --publish`
+# process keeps current, instead of each loading and writing its own
+SHARED_SNAPSHOT = os.environ.get('ROKU_SNAPSHOT', '').lower() == 'shared'
+
+# Sunday-to-Saturday week start for an ISO date expression (strftime %w: Sunday = 0);
+# the same rule as calendar_dim.build_calendar
+def week_start_sql(col):
+    return f"date({col}, '-' || strftime('%w', {col}) || ' days')"
+
+# roku_summary maintenance, shared with ingest.py's bulk path
+SUMMARY_ADD_ROW = f'''
+    INSERT INTO roku_summary (reportdate, week_start, servicecode, Model, invoice_code,
+                              qty, amount, rate_sum, row_count)
+    VALUES (date(NEW.reportdate), {week_start_sql('NEW.reportdate')}, NEW.servicecode,
+            NEW.Model, NEW.invoice_code, NEW.qty, NEW.amount, NEW.rate, 1)
+    ON CONFLICT (reportdate, servicecode, Model, invoice_code) DO UPDATE SET
+        qty = qty + excluded.qty,
+        amount = amount + excluded.amount,
+        rate_sum = rate_sum + excluded.rate_sum,
+        row_count = row_count + 1;
+'''
+SUMMARY_INSERT_TRIGGER = ('CREATE TRIGGER IF NOT EXISTS trg_roku_summary_insert AFTER INSERT ON roku_data '
+                          f'BEGIN {SUMMARY_ADD_ROW} END')
+
+
+def summary_rollup_sql(where='1'):
+    """Add the roku_data rows matching where into roku_summary, one grouped upsert"""
+    return f'''
+    INSERT INTO roku_summary (reportdate, week_start, servicecode, Model, invoice_code,
+                              qty, amount, rate_sum, row_count)
+    SELECT date(reportdate), {week_start_sql('reportdate')}, servicecode, Model, invoice_code,
+           SUM(qty), SUM(amount), SUM(rate), COUNT(*)
+    FROM roku_data
+    WHERE {where}
+    GROUP BY date(reportdate), servicecode, Model, invoice_code
+    ON CONFLICT (reportdate, servicecode, Model, invoice_code) DO UPDATE SET
+        qty = qty + excluded.qty,
+        amount = amount + excluded.amount,
+        rate_sum = rate_sum + excluded.rate_sum,
+        row_count = row_count + excluded.row_count
+    '''
+
+# Column projections per caller. Aggregates come from roku_summary, so raw rows are
+# only loaded for detail grids; the unused Rsa/Column20/Column21 extras are never read.
+DETAIL_COLUMNS = ('contec_id', 'reportdate', 'designator', 'TrackingID', 'invoice_code', 'qty', 'rate', 'amount',
+                  'invoice_number', 'servicecode', 'Palletsize', 'PalletCount', 'Model', 'TestDate',
+                  'FailureDescription', 'failurecode', 'PartDescription', 'invoicetype', 'Invoice_Reference')
+# Low-cardinality text columns held as pandas categoricals
+CATEGORY_COLUMNS = ['servicecode', 'Model', 'invoicetype', 'invoice_code']
+# Optional columns, and the placeholder text extracts put in them for "no value"
+NULLABLE_COLUMNS = ['designator', 'TrackingID', 'invoice_number', 'Palletsize', 'PalletCount', 'TestDate',
+                    'FailureDescription', 'failurecode', 'PartDescription', 'Invoice_Reference']
+NULL_TOKENS = {'', 'nan', 'NaN', 'NAN', 'None', 'NULL', 'null', 'NaT'}
+
+# Also used by synth.py, which bulk-loads the table before any index exists
+ROKU_DATA_DDL = '''
+CREATE TABLE IF NOT EXISTS roku_data (
+    contec_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    reportdate DATE NOT NULL,
+    designator VARCHAR,
+    TrackingID VARCHAR,
+    invoice_code VARCHAR NOT NULL,
+    qty INTEGER NOT NULL,
+    rate FLOAT NOT NULL,
+    amount FLOAT NOT NULL,
+    invoice_number VARCHAR,
+    servicecode VARCHAR NOT NULL,
+    Palletsize INTEGER,
+    PalletCount INTEGER,
+    Model VARCHAR NOT NULL,
+    TestDate DATE,
+    FailureDescription VARCHAR,
+    failurecode VARCHAR,
+    PartDescription VARCHAR,
+    invoicetype VARCHAR NOT NULL,
+    Invoice_Reference VARCHAR
+)
+'''
+
+# Applied to every pooled connection: WAL so readers never block on the writer,
+# a 64 MB page cache, 256 MB of memory-mapped I/O and a wait instead of
+# "database is locked" when another session is writing
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA temp_store = MEMORY',
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool.
+
+    Every statement runs on an InstrumentedCursor, so it is timed in
+    querylog.query_log whether it comes from conn.execute(), a cursor or
+    pd.read_sql_query().
+    """
+    pool = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        # sqlite3.Connection.execute() would bypass cursor()
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def discard(self):
+        """Really close the underlying connection"""
+        self.pool = None
+        super().close()
+
+
+class ConnectionPool:
+    """Bounded pool of preconfigured SQLite connections shared by all sessions"""
+
+    def __init__(self, db_name, max_size=8, timeout=30):
+        self.db_name = db_name
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._checked_out = set()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.acquired = 0
+        self.reused = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.peak_in_use = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, factory=PooledConnection, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.pool = self
+        return conn
+
+    def acquire(self):
+        """Take an idle connection, open a new one below max_size, or wait for a release"""
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self.created < self.max_size:
+                    self.created += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self.created -= 1
+                    raise
+                reused = False
+            else:
+                started = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"No database connection available after {self.timeout}s (pool size {self.max_size})")
+                with self._lock:
+                    self.waits += 1
+                    self.wait_seconds += time.perf_counter() - started
+                reused = True
+
+        with self._lock:
+            self._checked_out.add(conn)
+            self.acquired += 1
+            self.reused += int(reused)
+            self.peak_in_use = max(self.peak_in_use, len(self._checked_out))
+        return conn
+
+    def release(self, conn):
+        """Return a connection; an open transaction is rolled back first"""
+        with self._lock:
+            if conn not in self._checked_out:
+                return  # already released
+            self._checked_out.discard(conn)
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.discard()
+            with self._lock:
+                self.created -= 1
+            return
+        self._idle.put(conn)
+
+    def close_all(self):
+        """Close idle connections; checked-out ones are closed when they come back"""
+        while True:
+            try:
+                self._idle.get_nowait().discard()
+            except queue.Empty:
+                break
+            with self._lock:
+                self.created -= 1
+
+    def stats(self):
+        """Pool usage counters for display or logging"""
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'open': self.created,
+                'in_use': len(self._checked_out),
+                'idle': self._idle.qsize(),
+                'peak_in_use': self.peak_in_use,
+                'acquired': self.acquired,
+                'reused': self.reused,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 3),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Databases already brought up to SCHEMA_VERSION by this process
+_bootstrapped = set()
+_bootstrap_lock = threading.Lock()
+
+
+def get_pool(db_name):
+    """Process-wide pool for db_name, so rebuilt DatabaseManagers share connections"""
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = _pools[db_name] = ConnectionPool(db_name)
+        return pool
+
+
+class DatabaseManager:
+    def __init__(self, db_name='mycontec.db', shared_snapshot=None):
+        self.db_name = db_name
+        self.pool = get_pool(db_name)
+        self.snapshot = ColumnarSnapshot(db_name)
+        self.shared_snapshot = SHARED_SNAPSHOT if shared_snapshot is None else shared_snapshot
+        self.init_db()
+        
+    def init_db(self):
+        """Bring the schema up to SCHEMA_VERSION, once per database per process.
+
+        Each migration runs only while PRAGMA user_version is below its number,
+        so a current database costs a single PRAGMA read, and Streamlit reruns
+        in the same process skip even that.
+        """
+        with _bootstrap_lock:
+            if self.db_name in _bootstrapped:
+                return
+            migrations = (
+                (1, self.create_base_schema),
+                (2, self.create_summary_tables),
+                (3, self.create_ingest_indexes),
+                (5, self.create_change_tracking),
+                (6, self.normalise_null_placeholders),
+                (7, self.create_session_store),
+                (8, self.create_date_checks),
+                (9, self.migrate_date_columns),
+                (10, self.drop_calendar_table),
+            )
+            conn = self.get_connection()
+            try:
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                for target, migrate in migrations:
+                    if version < target:
+                        migrate(conn)
+                        conn.execute(f'PRAGMA user_version = {target}')
+                        conn.commit()
+                        version = target
+            finally:
+                conn.close()
+            _bootstrapped.add(self.db_name)
+
+    def create_base_schema(self, conn):
+        """Create roku_data and user tables, seed the admin user and normalise stored values"""
+        cursor = conn.cursor()
+        
+        # Create roku_data table
+        cursor.execute(ROKU_DATA_DDL)
+        
+        # Create user credentials table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            is_admin BOOLEAN NOT NULL DEFAULT 0,
+            is_superadmin BOOLEAN NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP
+        )
+        ''')
+        
+        # Create indexes for better performance
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reportdate ON roku_data(reportdate)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_servicecode ON roku_data(servicecode)')
+        
+        # Ensure admin user exists; bcrypt only runs when it has to be created
+        if cursor.execute('SELECT 1 FROM users WHERE username = ?', ("admin",)).fetchone() is None:
+            admin_password = bcrypt.hashpw("admin123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            cursor.execute('''
+            INSERT OR IGNORE INTO users (username, password_hash, is_admin, is_superadmin) 
+            VALUES (?, ?, 1, 1)
+            ''', ("admin", admin_password))
+        
+        conn.commit()
+
+        self.migrate_date_columns(conn)
+
+    def migrate_date_columns(self, conn, batch_size=50000):
+        """Rewrite legacy M/D/YYYY dates as ISO-8601 and numeric text as numbers.
+
+        Runs in committed contec_id batches and only touches rows still in the
+        old encoding, so an interrupted run resumes where it stopped. Month and
+        day may or may not be zero-padded ('1/6/2025' and '01/06/2025').
+        """
+        def iso(col):
+            rest = f"substr({col}, instr({col}, '/') + 1)"
+            month = f"substr({col}, 1, instr({col}, '/') - 1)"
+            day = f"substr({rest}, 1, instr({rest}, '/') - 1)"
+            year = f"substr({rest}, instr({rest}, '/') + 1)"
+            return f"{year} || '-' || printf('%02d', {month}) || '-' || printf('%02d', {day})"
+
+        def legacy(col):
+            return (f"{col} GLOB '[0-9]*/[0-9]*/[0-9][0-9][0-9][0-9]' AND length({col}) <= 10 "
+                    f"AND {col} NOT GLOB '*/*/*/*'")
+
+        statements = [
+            f"UPDATE roku_data SET reportdate = {iso('reportdate')} "
+            f"WHERE contec_id > ? AND contec_id <= ? AND {legacy('reportdate')}",
+            f"UPDATE roku_data SET TestDate = {iso('TestDate')} "
+            f"WHERE contec_id > ? AND contec_id <= ? AND {legacy('TestDate')}",
+            "UPDATE roku_data SET TestDate = NULL "
+            "WHERE contec_id > ? AND contec_id <= ? AND TestDate IN ('NaN', '')",
+            # Extracts carry thousands separators ('1,200'), which SQLite keeps as text
+            "UPDATE roku_data SET qty = CAST(REPLACE(qty, ',', '') AS INTEGER) "
+            "WHERE contec_id > ? AND contec_id <= ? AND typeof(qty) = 'text'",
+            "UPDATE roku_data SET amount = CAST(REPLACE(amount, ',', '') AS REAL) "
+            "WHERE contec_id > ? AND contec_id <= ? AND typeof(amount) = 'text'",
+            "UPDATE roku_data SET rate = CAST(REPLACE(rate, ',', '') AS REAL) "
+            "WHERE contec_id > ? AND contec_id <= ? AND typeof(rate) = 'text'",
+        ]
+
+        max_id = conn.execute('SELECT COALESCE(MAX(contec_id), 0) FROM roku_data').fetchone()[0]
+        changed = 0
+        for lower in range(0, max_id, batch_size):
+            for statement in statements:
+                changed += conn.execute(statement, (lower, lower + batch_size)).rowcount
+            conn.commit()
+
+        if changed:
+            # Rebuild the indexes over the rewritten values and refresh planner stats
+            conn.execute('REINDEX roku_data')
+            conn.execute('ANALYZE roku_data')
+    
+    def create_summary_tables(self, conn):
+        """Create the daily/weekly summary of roku_data and the triggers that maintain it.
+
+        One row per reportdate x servicecode x Model x invoice_code, carrying its
+        Sunday week_start, so weekly, monthly and arbitrary date-range rollups are
+        exact without touching roku_data. Triggers keep it current on every write.
+        """
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS roku_summary (
+            reportdate DATE NOT NULL,
+            week_start DATE NOT NULL,
+            servicecode VARCHAR NOT NULL,
+            Model VARCHAR NOT NULL,
+            invoice_code VARCHAR NOT NULL,
+            qty INTEGER NOT NULL DEFAULT 0,
+            amount FLOAT NOT NULL DEFAULT 0,
+            rate_sum FLOAT NOT NULL DEFAULT 0,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (reportdate, servicecode, Model, invoice_code)
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_summary_week_start ON roku_summary(week_start)')
+
+        remove_row = '''
+            UPDATE roku_summary SET
+                qty = qty - OLD.qty,
+                amount = amount - OLD.amount,
+                rate_sum = rate_sum - OLD.rate,
+                row_count = row_count - 1
+            WHERE reportdate = date(OLD.reportdate) AND servicecode = OLD.servicecode
+              AND Model = OLD.Model AND invoice_code = OLD.invoice_code;
+            DELETE FROM roku_summary
+            WHERE reportdate = date(OLD.reportdate) AND servicecode = OLD.servicecode
+              AND Model = OLD.Model AND invoice_code = OLD.invoice_code AND row_count <= 0;
+        '''
+        conn.execute(SUMMARY_INSERT_TRIGGER)
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS trg_roku_summary_delete AFTER DELETE ON roku_data BEGIN {remove_row} END')
+        conn.execute(
+            'CREATE TRIGGER IF NOT EXISTS trg_roku_summary_update '
+            'AFTER UPDATE OF reportdate, servicecode, Model, invoice_code, qty, amount, rate ON roku_data '
+            f'BEGIN {remove_row} {SUMMARY_ADD_ROW} END'
+        )
+
+        # Backfill after the triggers exist so no concurrent write is missed
+        conn.execute('DELETE FROM roku_summary')
+        conn.execute(summary_rollup_sql())
+
+    def create_ingest_indexes(self, conn):
+        """Index used by ingest.py to detect rows that are already stored"""
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tracking_invoice ON roku_data(TrackingID, invoice_number)')
+
+    def drop_calendar_table(self, conn):
+        """Remove the roku_calendar table; no query ever joined it"""
+        conn.execute('DROP TABLE IF EXISTS roku_calendar')
+
+    def create_change_tracking(self, conn):
+        """Count UPDATEs and DELETEs on roku_data so loaders can tell append-only changes apart.
+
+        New invoice rows only ever append with increasing contec_id. While the
+        rewrite generation is unchanged, a loaded frame can be brought up to
+        date with just the rows above its highest contec_id.
+        """
+        conn.execute('CREATE TABLE IF NOT EXISTS roku_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.execute("INSERT OR IGNORE INTO roku_meta (key, value) VALUES ('rewrite_generation', 0)")
+        bump = "UPDATE roku_meta SET value = value + 1 WHERE key = 'rewrite_generation';"
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS trg_roku_meta_update AFTER UPDATE ON roku_data BEGIN {bump} END')
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS trg_roku_meta_delete AFTER DELETE ON roku_data BEGIN {bump} END')
+
+    def normalise_null_placeholders(self, conn, batch_size=50000):
+        """Store missing optional values as NULL, as ingest.py does for new rows.
+
+        Older loads kept the extract's 'NaN' text, so `IS` comparisons in the
+        ingest duplicate check never matched those rows against a re-import.
+        """
+        tokens = sorted(NULL_TOKENS)
+        in_list = ', '.join('?' for _ in tokens)
+        max_id = conn.execute('SELECT COALESCE(MAX(contec_id), 0) FROM roku_data').fetchone()[0]
+        for lower in range(0, max_id, batch_size):
+            for col in NULLABLE_COLUMNS:
+                conn.execute(f"UPDATE roku_data SET {col} = NULL "
+                             f"WHERE contec_id > ? AND contec_id <= ? AND {col} IN ({in_list})",
+                             (lower, lower + batch_size, *tokens))
+            conn.commit()
+        conn.execute('ANALYZE roku_data')
+
+    def create_session_store(self, conn):
+        """Record outstanding session codes so each can be redeemed once and revoked.
+
+        Bumping a user's session_generation invalidates every code issued
+        before it, including ones still sitting in other browsers' URLs.
+        """
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(users)')}
+        if 'session_generation' not in columns:
+            conn.execute('ALTER TABLE users ADD COLUMN session_generation INTEGER NOT NULL DEFAULT 0')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS session_codes (
+            nonce TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            expires_at INTEGER NOT NULL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_session_codes_username ON session_codes(username)')
+
+    def create_date_checks(self, conn):
+        """Reject rows whose reportdate SQLite cannot read as a date.
+
+        roku_summary is keyed by date(reportdate), which is NULL for anything
+        else, including the legacy MM/DD/YYYY extracts; without the check such
+        an insert failed on roku_summary's NOT NULL constraint instead.
+        """
+        check = ("SELECT RAISE(ABORT, 'roku_data.reportdate must be an ISO-8601 date (YYYY-MM-DD); "
+                 "convert MM/DD/YYYY extract dates before writing them');")
+        conn.execute('CREATE TRIGGER IF NOT EXISTS trg_roku_data_reportdate_insert BEFORE INSERT ON roku_data '
+                     f'WHEN date(NEW.reportdate) IS NULL BEGIN {check} END')
+        conn.execute('CREATE TRIGGER IF NOT EXISTS trg_roku_data_reportdate_update BEFORE UPDATE OF reportdate ON roku_data '
+                     f'WHEN date(NEW.reportdate) IS NULL BEGIN {check} END')
+
+    def get_connection(self):
+        """Get a pooled database connection; close() returns it to the pool"""
+        return self.pool.acquire()
+
+    def pool_stats(self):
+        """Connection pool usage counters"""
+        return self.pool.stats()
+
+    def query_stats(self, limit=20):
+        """The costliest statements in total and the recent slow ones, with their plans"""
+        return {'statements': query_log.statements()[:limit], 'slow': query_log.slow_queries()[:limit]}
+
+    def snapshot_version(self):
+        """Published snapshot version the loaders serve with shared_snapshot, else None"""
+        return self.snapshot.current_version() if self.shared_snapshot else None
+
+    def snapshot_stats(self):
+        """Published snapshot version and whether this process only maps it"""
+        return {'shared': self.shared_snapshot, **self.snapshot.stats()}
+
+    def store_session_code(self, nonce, username, expires_at, replaces=None):
+        """Record a newly issued session code, retiring the one it replaces and any expired ones"""
+        conn = self.get_connection()
+        try:
+            if replaces is not None:
+                conn.execute('DELETE FROM session_codes WHERE nonce = ?', (replaces,))
+            conn.execute('DELETE FROM session_codes WHERE expires_at < ?', (int(time.time()),))
+            conn.execute('INSERT INTO session_codes (nonce, username, expires_at) VALUES (?, ?, ?)',
+                         (nonce, username, expires_at))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def redeem_session_code(self, nonce, username):
+        """Consume an unexpired session code; False if it was already used, revoked or expired"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute('DELETE FROM session_codes WHERE nonce = ? AND username = ? AND expires_at >= ?',
+                                  (nonce, username, int(time.time())))
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def revoke_sessions(self, username):
+        """Invalidate every session code issued to username, used or not"""
+        conn = self.get_connection()
+        try:
+            conn.execute('UPDATE users SET session_generation = session_generation + 1 WHERE username = ?',
+                         (username,))
+            conn.execute('DELETE FROM session_codes WHERE username = ?', (username,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def _select_columns(self, columns):
+        """SELECT list for an optional column projection"""
+        if columns is None:
+            return '*'
+        return ', '.join(f'"{col}"' for col in columns)
+
+    def _compact_dtypes(self, df):
+        """Categoricals for low-cardinality text, smallest integer dtypes for counts"""
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        for col in df.columns:
+            if pd.api.types.is_integer_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        # Money stays float64: float32 would show a rate of 3.9 as 3.9000000954 in grids and exports
+        return df
+
+    def _prepare_roku_frame(self, df, compact=True):
+        """Ensure proper data types on a frame read from roku_data"""
+        # Dates are stored as ISO-8601, so a fixed-format vectorised parse is enough
+        if 'reportdate' in df.columns:
+            df['reportdate'] = pd.to_datetime(df['reportdate'], format='ISO8601')
+        if 'qty' in df.columns:
+            df['qty'] = pd.to_numeric(df['qty'], errors='coerce').fillna(0).astype(int)
+        if 'amount' in df.columns:
+            df['amount'] = pd.to_numeric(df['amount'], errors='coerce').fillna(0).round(2)
+        if 'rate' in df.columns:
+            df['rate'] = pd.to_numeric(df['rate'], errors='coerce').fillna(0).round(2)
+        return self._compact_dtypes(df) if compact else df
+
+    def _rewrite_generation(self, conn):
+        return conn.execute("SELECT value FROM roku_meta WHERE key = 'rewrite_generation'").fetchone()[0]
+
+    @perf.timed('sql:get_roku_data')
+    def get_roku_data(self, columns=None, use_snapshot=True):
+        """Get all rows from roku_data table, optionally projected to the given columns.
+
+        Served from the memory-mapped snapshot when one exists for the current
+        rewrite generation, topped up with any rows appended since. Otherwise
+        only the requested columns are read, and a full read rewrites the
+        snapshot for the next worker. Either way the frame has the dtypes
+        _prepare_roku_frame gives it.
+
+        With shared_snapshot the published version is returned as mapped, even
+        if the publisher has not caught up with the latest rows yet; SQLite is
+        only read while nothing has been published. use_snapshot=False reads
+        SQLite and leaves the snapshot alone, as benchmarks need.
+        """
+        if use_snapshot and self.shared_snapshot:
+            df = self.snapshot.load(None, columns)
+            if df is not None:
+                return df
+        elif use_snapshot:
+            conn = self.get_connection()
+            try:
+                generation = self._rewrite_generation(conn)
+            finally:
+                conn.close()
+
+            df = self.snapshot.load(generation, columns)
+            if df is not None:
+                topped_up = self.append_new_roku_rows(df, columns)
+                if topped_up is not None:
+                    if len(topped_up) > len(df) and columns is None:
+                        self._write_snapshot(topped_up)
+                    return topped_up
+
+        conn = self.get_connection()
+        try:
+            # One read transaction so the generation matches the rows read
+            conn.execute('BEGIN')
+            generation = self._rewrite_generation(conn)
+            # contec_id is always read so a later top-up knows where to continue
+            select = columns if columns is None or 'contec_id' in columns else ['contec_id', *columns]
+            df = pd.read_sql_query(f"SELECT {self._select_columns(select)} FROM roku_data", conn)
+        finally:
+            conn.close()
+        last_id = int(df['contec_id'].max()) if len(df) else 0
+        if select is not columns:
+            df = df.drop(columns='contec_id')
+        df = self._prepare_roku_frame(df)
+        df.attrs['rewrite_generation'] = generation
+        df.attrs['last_contec_id'] = last_id
+        if columns is None and use_snapshot:
+            self._write_snapshot(df)
+        return df
+
+    def _write_snapshot(self, df):
+        if self.shared_snapshot:
+            # Left to the publisher, so workers never race it for new versions
+            return
+        try:
+            self.snapshot.write(df, df.attrs['rewrite_generation'])
+        except OSError:
+            # A read-only deployment still works, just without the fast start
+            pass
+
+    def append_new_roku_rows(self, df, columns=None):
+        """df extended with the rows appended since it was loaded by get_roku_data.
+
+        Returns None when a full reload is needed instead: rows were updated or
+        deleted since (the rewrite generation moved on) or df carries no
+        generation or contec_id to continue from.
+        """
+        generation = df.attrs.get('rewrite_generation')
+        if generation is None or ('contec_id' not in df.columns and 'last_contec_id' not in df.attrs):
+            return None
+        last_id = df.attrs.get('last_contec_id')
+        if last_id is None:
+            last_id = int(df['contec_id'].max()) if len(df) else 0
+        conn = self.get_connection()
+        try:
+            conn.execute('BEGIN')
+            if self._rewrite_generation(conn) != generation:
+                return None
+            # Served by the contec_id primary key, so only the new rows are touched
+            select = columns if columns is None or 'contec_id' in columns else ['contec_id', *columns]
+            new_rows = pd.read_sql_query(
+                f"SELECT {self._select_columns(select)} FROM roku_data WHERE contec_id > ? ORDER BY contec_id",
+                conn, params=[last_id])
+        finally:
+            conn.close()
+        if new_rows.empty:
+            return df
+
+        last_id = int(new_rows['contec_id'].max())
+        if select is not columns:
+            new_rows = new_rows.drop(columns='contec_id')
+        new_rows = self._prepare_roku_frame(new_rows)
+        # Shallow copy: the cached frame may be in use by other sessions
+        old_rows = df.copy(deep=False)
+        for col in df.select_dtypes('category').columns:
+            if not isinstance(new_rows[col].dtype, pd.CategoricalDtype):
+                new_rows[col] = new_rows[col].astype('category')
+            # Appending new categories keeps the existing codes valid, so both
+            # sides share one category list and concat keeps the categorical
+            added = new_rows[col].cat.categories.difference(df[col].cat.categories)
+            categories = df[col].cat.categories.append(added)
+            if len(added):
+                old_rows[col] = df[col].cat.set_categories(categories)
+            new_rows[col] = new_rows[col].cat.set_categories(categories)
+        for col in new_rows.columns:
+            # Give an all-NULL batch column the loaded column's dtype (float64 for integers, as a
+            # full reload would) rather than rely on concat skipping all-NA columns, which pandas deprecates
+            if new_rows[col].dtype != df[col].dtype and new_rows[col].isna().all():
+                dtype = 'float64' if pd.api.types.is_integer_dtype(df[col]) else df[col].dtype
+                new_rows[col] = new_rows[col].astype(dtype)
+        merged = pd.concat([old_rows, new_rows], ignore_index=True)
+        merged.attrs['rewrite_generation'] = generation
+        merged.attrs['last_contec_id'] = last_id
+        return merged
+
+    def _date_bounds(self, from_date, to_date):
+        """ISO bounds for a half-open [from_date, to_date + 1 day) range"""
+        start = pd.Timestamp(from_date).strftime('%Y-%m-%d')
+        # Half-open upper bound so rows stored with a time component still match
+        end = (pd.Timestamp(to_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        return start, end
+
+    @perf.timed('sql:get_roku_data_range')
+    def get_roku_data_range(self, from_date, to_date, servicecode=None, columns=None):
+        """Get roku_data rows with reportdate between from_date and to_date (inclusive)"""
+        query = f"SELECT {self._select_columns(columns)} FROM roku_data WHERE reportdate >= ? AND reportdate < ?"
+        params = list(self._date_bounds(from_date, to_date))
+        if servicecode is not None:
+            query += " AND servicecode = ?"
+            params.append(servicecode)
+        conn = self.get_connection()
+        try:
+            # Served by idx_reportdate as a range scan
+            df = pd.read_sql_query(query, conn, params=params)
+            return self._prepare_roku_frame(df)
+        finally:
+            conn.close()
+
+    def _roku_filters(self, from_date=None, to_date=None, servicecodes=None, models=None, search=None):
+        """WHERE clause and parameters shared by the paged grid and exports"""
+        conditions = []
+        params = []
+        if from_date is not None and to_date is not None:
+            conditions.append("reportdate >= ? AND reportdate < ?")
+            params.extend(self._date_bounds(from_date, to_date))
+        for col, values in (('servicecode', servicecodes), ('Model', models)):
+            if values:
+                conditions.append(f"{col} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+        if search:
+            conditions.append("(designator LIKE ? OR TrackingID LIKE ? OR invoice_number LIKE ?)")
+            params.extend([f'%{search}%'] * 3)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params
+
+    def _order_by(self, sort_by, descending):
+        if sort_by not in DETAIL_COLUMNS:
+            raise ValueError(f"Cannot sort by {sort_by!r}")
+        # contec_id breaks ties so pages never overlap or skip rows
+        return f' ORDER BY "{sort_by}" {"DESC" if descending else "ASC"}, contec_id'
+
+    @perf.timed('sql:get_roku_page')
+    def get_roku_page(self, sort_by='contec_id', descending=False, limit=100, offset=0, columns=None, **filters):
+        """One page of roku_data rows and the number of rows matching the filters.
+
+        Filtering, sorting and paging all run in SQLite, so only `limit` rows
+        are read into pandas however large the table is.
+        """
+        order = self._order_by(sort_by, descending)
+        where, params = self._roku_filters(**filters)
+        conn = self.get_connection()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM roku_data{where}", params).fetchone()[0]
+            query = f"SELECT {self._select_columns(columns)} FROM roku_data{where}{order} LIMIT ? OFFSET ?"
+            df = pd.read_sql_query(query, conn, params=params + [int(limit), int(offset)])
+            return self._prepare_roku_frame(df), total
+        finally:
+            conn.close()
+
+    def iter_roku_rows(self, sort_by='contec_id', descending=False, chunksize=50000, columns=None, **filters):
+        """Yield the filtered rows as DataFrames of at most chunksize rows.
+
+        Chunks keep plain dtypes (no categoricals or downcasting) so every
+        chunk has the same schema when appended to one output file.
+        """
+        order = self._order_by(sort_by, descending)
+        where, params = self._roku_filters(**filters)
+        conn = self.get_connection()
+        try:
+            query = f"SELECT {self._select_columns(columns)} FROM roku_data{where}{order}"
+            for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+                yield self._prepare_roku_frame(chunk, compact=False)
+        finally:
+            conn.close()
+
+    @perf.timed('sql:get_roku_summary')
+    def get_roku_summary(self, from_date=None, to_date=None):
+        """Get pre-aggregated roku_summary rows, optionally bounded by reportdate"""
+        query = "SELECT * FROM roku_summary"
+        params = []
+        if from_date is not None and to_date is not None:
+            query += " WHERE reportdate >= ? AND reportdate < ?"
+            params = list(self._date_bounds(from_date, to_date))
+        conn = self.get_connection()
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+            df['reportdate'] = pd.to_datetime(df['reportdate'], format='ISO8601')
+            df['week_start'] = pd.to_datetime(df['week_start'], format='ISO8601')
+            df['amount'] = df['amount'].round(2)
+            return self._compact_dtypes(df)
+        finally:
+            conn.close()
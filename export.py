@@ -0,0 +1,162 @@
+"""Chunked export of filtered roku_data rows to CSV, Excel or Parquet.
+
+Rows stream out of SQLite in fixed-size chunks and each chunk is appended to
+the output file before the next one is read, so memory use is set by the
+chunk size rather than by how many rows are exported.
+
+Usage:
+    python export.py rows.parquet --from 2025-01-01 --to 2025-03-31 --servicecode SCOMPLETE
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+from database import DatabaseManager, DETAIL_COLUMNS
+
+EXPORT_FORMATS = {'CSV': 'csv', 'Excel': 'xlsx', 'Parquet': 'parquet'}
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# Excel's sheet limit, less the header row
+EXCEL_MAX_ROWS = 1048575
+INTEGER_COLUMNS = ['contec_id', 'qty']
+FLOAT_COLUMNS = ['rate', 'amount', 'Palletsize', 'PalletCount']
+
+
+def _write_csv(chunks, path):
+    rows = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=rows == 0, date_format='%Y-%m-%d')
+            rows += len(chunk)
+    return rows
+
+
+def _write_xlsx(chunks, path):
+    from openpyxl import Workbook
+
+    # write_only streams rows to disk instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_rows = 0
+    rows = 0
+    for chunk in chunks:
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for record in chunk.itertuples(index=False, name=None):
+            if sheet is None or sheet_rows >= EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet(f'roku_data_{len(workbook.worksheets) + 1}')
+                sheet.append(list(chunk.columns))
+                sheet_rows = 0
+            sheet.append([value.to_pydatetime() if isinstance(value, pd.Timestamp) else value for value in record])
+            sheet_rows += 1
+        rows += len(chunk)
+    if sheet is None:
+        workbook.create_sheet('roku_data_1')
+    workbook.save(path)
+    return rows
+
+
+def _parquet_schema(columns):
+    import pyarrow as pa
+
+    fields = []
+    for col in columns:
+        if col == 'reportdate':
+            fields.append(pa.field(col, pa.timestamp('ns')))
+        elif col in INTEGER_COLUMNS:
+            fields.append(pa.field(col, pa.int64()))
+        elif col in FLOAT_COLUMNS:
+            fields.append(pa.field(col, pa.float64()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def _write_parquet(chunks, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # Fixed up front: a chunk whose optional column is all-NULL must not change the schema
+                schema = _parquet_schema(chunk.columns)
+                writer = pq.ParquetWriter(path, schema, compression='zstd')
+            for col in chunk.columns:
+                if schema.field(col).type == pa.string():
+                    chunk[col] = chunk[col].map(lambda value: None if pd.isna(value) else str(value))
+                elif col in INTEGER_COLUMNS:
+                    chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('Int64')
+                elif col in FLOAT_COLUMNS:
+                    # Extracts store missing pallet figures as the text 'NaN'
+                    chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+        if writer is None:
+            writer = pq.ParquetWriter(path, _parquet_schema(DETAIL_COLUMNS), compression='zstd')
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {'csv': _write_csv, 'xlsx': _write_xlsx, 'parquet': _write_parquet}
+
+
+def export_rows(db_manager, path, fmt, columns=DETAIL_COLUMNS, chunksize=50000, **query):
+    """Write the rows matching query (filters and sort) to path; returns the row count"""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    chunks = db_manager.iter_roku_rows(columns=columns, chunksize=chunksize, **query)
+    try:
+        return WRITERS[fmt](chunks, path)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+
+def remove_stale_exports(directory, max_age=3600):
+    """Delete export files older than max_age seconds"""
+    cutoff = time.time() - max_age
+    for path in glob.glob(os.path.join(directory, 'roku_export_*')):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export filtered roku_data rows")
+    parser.add_argument('path', help="output file; the extension picks the format (.csv, .xlsx, .parquet)")
+    parser.add_argument('--db', default='mycontec.db', help="SQLite database (default: mycontec.db)")
+    parser.add_argument('--from', dest='from_date', help="first reportdate (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='to_date', help="last reportdate (YYYY-MM-DD, inclusive)")
+    parser.add_argument('--servicecode', action='append', help="repeat to include several")
+    parser.add_argument('--model', action='append', help="repeat to include several")
+    parser.add_argument('--chunksize', type=int, default=50000, help="rows read from SQLite per chunk")
+    args = parser.parse_args(argv)
+
+    fmt = os.path.splitext(args.path)[1].lstrip('.').lower()
+    if fmt not in WRITERS:
+        parser.error(f"unsupported extension .{fmt}; use .csv, .xlsx or .parquet")
+
+    started = time.perf_counter()
+    rows = export_rows(DatabaseManager(args.db), args.path, fmt, chunksize=args.chunksize,
+                       from_date=args.from_date, to_date=args.to_date,
+                       servicecodes=args.servicecode, models=args.model)
+    print(f"Wrote {rows:,} rows to {args.path} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
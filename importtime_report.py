@@ -0,0 +1,161 @@
+"""Cold-start import cost of roku.py, before and after the per-page split.
+
+Each measurement runs in a fresh interpreter so nothing is already in
+sys.modules. 'eager' is the import block roku.py used to carry; 'startup' is
+what it imports now, read from roku.py's module-level import statements so it
+never falls behind the app; each page row is the extra cost of opening that page
+for the first time on top of startup.
+
+Usage:
+    python importtime_report.py --repeat 5
+    python importtime_report.py --top 15      # also list the slowest modules at startup
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Module-level imports of roku.py as of the baseline commit 67561ab, verbatim
+# (duplicates included), i.e. exactly what the old single-file app paid at startup
+EAGER_IMPORTS = '''
+import os
+import time, timezones
+import pytz
+import json
+import sqlite3
+import pandas as pd
+import numpy as np
+import streamlit as st
+import bcrypt
+import plotly.graph_objects as go
+import plotly.figure_factory as ff
+import plotly.express as px
+import matplotlib.pyplot as plt
+from datetime import datetime, timedelta
+from st_aggrid import GridOptionsBuilder, AgGrid, JsCode
+from cachetools import TTLCache, cached
+import requests
+from io import StringIO
+from urllib.parse import urljoin
+from io import StringIO
+from cachetools import cached, TTLCache
+import streamlit as st
+'''
+
+PAGE_LABELS = {
+    'home': 'Home',
+    'monthly_revenue': 'Monthly Revenue',
+    'weekly_revenue': 'Weekly Revenue',
+    'weekly_services': 'Weekly Services',
+    'statistical': 'Statistical',
+    'analysis': 'Analysis',
+}
+
+TIMER = '''
+import time as _t
+_start = _t.perf_counter()
+{setup}
+_mid = _t.perf_counter()
+{imports}
+print(_t.perf_counter() - _mid)
+'''
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def startup_imports(path=os.path.join(HERE, 'roku.py')):
+    """The module-level import statements of roku.py, one per line"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _run(code, extra_args=()):
+    result = subprocess.run([sys.executable, *extra_args, '-c', code], cwd=HERE,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+    return result
+
+
+def time_imports(imports, setup='', repeat=5):
+    """Median seconds spent in `imports` in a fresh interpreter, after `setup` has run"""
+    code = TIMER.format(setup=setup, imports=imports)
+    samples = [float(_run(code).stdout.strip().splitlines()[-1]) for _ in range(repeat)]
+    return statistics.median(samples)
+
+
+def slowest_modules(imports, top=10):
+    """Largest cumulative import times reported by python -X importtime"""
+    stderr = _run(imports, ('-X', 'importtime')).stderr
+    rows = []
+    for line in stderr.splitlines():
+        # Nested imports are indented under their parent; keep top-level ones only
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)', line)
+        if match and not match.group(2):
+            rows.append((int(match.group(1)), match.group(3)))
+    return sorted(rows, reverse=True)[:top]
+
+
+def build_report(repeat=5):
+    """Timings in seconds; a failing import is reported rather than aborting the run"""
+    report = {'python': sys.version.split()[0], 'repeat': repeat, 'pages': {}}
+    startup = startup_imports()
+    for name, imports in (('eager', EAGER_IMPORTS), ('startup', startup)):
+        try:
+            report[name] = round(time_imports(imports, repeat=repeat), 4)
+        except RuntimeError as exc:
+            report[name] = f'error: {exc}'
+    for page, label in PAGE_LABELS.items():
+        try:
+            seconds = time_imports(f'import views.{page}', setup=startup, repeat=repeat)
+            report['pages'][label] = round(seconds, 4)
+        except RuntimeError as exc:
+            report['pages'][label] = f'error: {exc}'
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report roku.py cold-start import times")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per measurement (median is reported)")
+    parser.add_argument('--top', type=int, default=0, help="also list the N slowest top-level modules at startup")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.repeat)
+    if args.top:
+        try:
+            report['slowest_startup_modules'] = [
+                {'module': module, 'seconds': round(micros / 1e6, 4)}
+                for micros, module in slowest_modules(startup_imports(), args.top)
+            ]
+        except RuntimeError as exc:
+            print(f"Could not list slowest modules: {exc}", file=sys.stderr)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    def fmt(value):
+        return f'{value * 1000:8.1f} ms' if isinstance(value, float) else value
+
+    print(f"Python {report['python']}, median of {report['repeat']} fresh interpreters")
+    print(f"  eager imports (old roku.py) {fmt(report['eager'])}")
+    print(f"  startup imports (roku.py)   {fmt(report['startup'])}")
+    if isinstance(report['eager'], float) and isinstance(report['startup'], float):
+        print(f"  saved at cold start         {fmt(report['eager'] - report['startup'])}")
+    print("First open of each page, on top of startup:")
+    for label, seconds in report['pages'].items():
+        print(f"  {label:<27} {fmt(seconds)}")
+    if report.get('slowest_startup_modules'):
+        print("Slowest top-level modules at startup:")
+    for row in report.get('slowest_startup_modules', []):
+        print(f"  {row['module']:<27} {fmt(row['seconds'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
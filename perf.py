@@ -0,0 +1,191 @@
+"""Lightweight timing spans for pages, data loads and render stages.
+
+    with perf.span('figure'):
+        ...
+
+Spans nest: one opened inside another is recorded under its parent's path,
+e.g. 'page:weekly_revenue/load:roku_summary/sql:get_roku_summary', so a
+page's time breaks down into its SQL loads, pandas computations, figures and
+grids. The last SAMPLES durations of each path are kept in process memory,
+from which the admin panel and the exporters report p50/p95.
+
+Exporters are off unless configured in the environment:
+    ROKU_METRICS_FILE  Prometheus text file, rewritten at most every
+                       EXPORT_INTERVAL seconds; '{pid}' in the path gives each
+                       worker its own file (for node_exporter's textfile collector)
+    ROKU_METRICS_PORT  serve the same text at http://127.0.0.1:<port>/metrics;
+                       give each worker its own port
+"""
+import contextvars
+import functools
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLES = 500
+EXPORT_INTERVAL = 15
+QUANTILES = (0.5, 0.95)
+
+# Path of the innermost open span in this thread (Streamlit runs each session's script on its own thread)
+_current = contextvars.ContextVar('perf_span', default='')
+
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted sequence"""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class SpanRecorder:
+    def __init__(self, samples=SAMPLES):
+        self.samples = samples
+        self._durations = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, path, seconds):
+        with self._lock:
+            durations = self._durations.get(path)
+            if durations is None:
+                durations = self._durations[path] = deque(maxlen=self.samples)
+                self._totals[path] = [0, 0.0]
+            durations.append(seconds)
+            totals = self._totals[path]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextmanager
+    def span(self, name):
+        """Time the block; spans that exit with an exception (including st.rerun) are not recorded"""
+        parent = _current.get()
+        path = f'{parent}/{name}' if parent else name
+        token = _current.set(path)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            _current.reset(token)
+        self.record(path, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator form of span()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """Per span path: count, p50/p95/max of the kept samples and total seconds, sorted by path"""
+        with self._lock:
+            snapshot = {path: (sorted(durations), *self._totals[path]) for path, durations in self._durations.items()}
+        rows = []
+        for path in sorted(snapshot):
+            ordered, count, total = snapshot[path]
+            rows.append({
+                'span': path,
+                'count': count,
+                'p50_ms': round(_percentile(ordered, 0.5) * 1000, 1),
+                'p95_ms': round(_percentile(ordered, 0.95) * 1000, 1),
+                'max_ms': round(ordered[-1] * 1000, 1),
+                'total_s': round(total, 2),
+            })
+        return rows
+
+    def prometheus_text(self):
+        """Spans as a Prometheus summary metric in the text exposition format"""
+        with self._lock:
+            snapshot = {path: (sorted(durations), *self._totals[path]) for path, durations in self._durations.items()}
+        lines = [
+            f'# HELP roku_span_seconds Wall time of app spans; quantiles over the last {self.samples} samples',
+            '# TYPE roku_span_seconds summary',
+        ]
+        for path in sorted(snapshot):
+            ordered, count, total = snapshot[path]
+            label = f'span="{_label(path)}",pid="{os.getpid()}"'
+            for q in QUANTILES:
+                lines.append(f'roku_span_seconds{{{label},quantile="{q}"}} {_percentile(ordered, q):.6f}')
+            lines.append(f'roku_span_seconds_sum{{{label}}} {total:.6f}')
+            lines.append(f'roku_span_seconds_count{{{label}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._totals.clear()
+
+
+class _Exporter:
+    """Writes ROKU_METRICS_FILE and serves ROKU_METRICS_PORT for one recorder"""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.path = os.environ.get('ROKU_METRICS_FILE')
+        self.port = os.environ.get('ROKU_METRICS_PORT')
+        self._written = 0.0
+        self._server = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the HTTP endpoint if configured; safe to call on every rerun"""
+        with self._lock:
+            if self._server is not None or not self.port:
+                return
+            recorder = self.recorder
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] != '/metrics':
+                        self.send_error(404)
+                        return
+                    body = recorder.prometheus_text().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            try:
+                self._server = ThreadingHTTPServer(('127.0.0.1', int(self.port)), Handler)
+            except (OSError, ValueError):
+                # Port taken by another worker or misconfigured; spans are still kept in memory
+                self.port = None
+                return
+            threading.Thread(target=self._server.serve_forever, name='perf-metrics', daemon=True).start()
+
+    def flush(self, force=False):
+        """Rewrite the metrics file if configured and EXPORT_INTERVAL has passed"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._written < EXPORT_INTERVAL:
+                return
+            self._written = now
+        path = self.path.replace('{pid}', str(os.getpid()))
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(self.recorder.prometheus_text())
+            # Replaced whole, so a scrape never reads a half-written file
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+
+recorder = SpanRecorder()
+span = recorder.span
+timed = recorder.timed
+exporter = _Exporter(recorder)
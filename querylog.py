@@ -0,0 +1,265 @@
+"""Per-statement SQL timings, a slow-query log and query-plan capture.
+
+Every pooled connection hands out InstrumentedCursor, which times a
+statement from execute() until its last row is fetched (or the cursor is
+closed or reused) and counts the rows. Timings are aggregated per statement
+text in query_log. A statement slower than the threshold has its
+EXPLAIN QUERY PLAN captured on the same connection, once, and is logged to
+the 'roku.sql' logger; plans that scan a whole FULL_SCAN_TABLES table rather
+than searching it through an index are flagged. The logger only emits where
+the process configures logging (e.g. logging.basicConfig), so ingest.py and
+the other command-line tools stay quiet; the admin panel lists slow queries
+either way.
+
+    ROKU_SLOW_QUERY_MS  slow-query threshold in milliseconds (default 200; 0 explains everything)
+
+To see the plan of every query the pages run against a database:
+    python querylog.py --db mycontec.db
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Tables too large to read in full on a page request
+FULL_SCAN_TABLES = ('roku_data',)
+# Statements EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+INDEX_PATTERN = re.compile(r'USING (?:COVERING )?INDEX (\w+)|USING (INTEGER PRIMARY KEY)')
+
+logger = logging.getLogger('roku.sql')
+# Without a handler of its own, warnings fall through to logging.lastResort on stderr
+logger.addHandler(logging.NullHandler())
+
+
+def plan_flags(plan):
+    """(tables scanned in full, indexes used) for EXPLAIN QUERY PLAN detail lines"""
+    scans, indexes = [], []
+    for detail in plan:
+        for table in FULL_SCAN_TABLES:
+            # 'SCAN roku_data USING INDEX ...' still reads every row, just in index order
+            if re.search(rf'\bSCAN (?:TABLE )?{table}\b', detail) and table not in scans:
+                scans.append(table)
+        for match in INDEX_PATTERN.finditer(detail):
+            index = match.group(1) or match.group(2)
+            if index not in indexes:
+                indexes.append(index)
+    return scans, indexes
+
+
+class QueryLog:
+    def __init__(self, threshold_ms=200.0, maxsize=256, slow_entries=100):
+        self.threshold_ms = threshold_ms
+        self.maxsize = maxsize
+        self._statements = OrderedDict()
+        self._slow = deque(maxlen=slow_entries)
+        self._lock = threading.Lock()
+
+    def record(self, conn, sql, params, seconds, rows):
+        text = ' '.join(sql.split())
+        with self._lock:
+            stats = self._statements.get(text)
+            if stats is None:
+                stats = self._statements[text] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'plan': None}
+                if len(self._statements) > self.maxsize:
+                    self._statements.popitem(last=False)
+            else:
+                self._statements.move_to_end(text)
+            ms = seconds * 1000
+            stats['count'] += 1
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['rows'] += rows
+            explain = ms >= self.threshold_ms and stats['plan'] is None
+        if ms < self.threshold_ms:
+            return
+
+        plan = self._explain(conn, text, params) if explain else stats['plan']
+        scans, indexes = plan_flags(plan or [])
+        with self._lock:
+            if explain:
+                stats['plan'] = plan
+            self._slow.append({
+                'at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'sql': text,
+                'ms': round(ms, 1),
+                'rows': rows,
+                'full_scan': ', '.join(scans),
+                'indexes': ', '.join(indexes),
+                'plan': plan,
+            })
+        logger.warning("%.0f ms, %d rows%s: %s", ms, rows,
+                       f" (full scan of {', '.join(scans)})" if scans else '', text)
+
+    def _explain(self, conn, sql, params):
+        if params is None or not sql.lstrip().upper().startswith(EXPLAINABLE):
+            return None
+        try:
+            # A plain cursor, so the EXPLAIN itself is not recorded
+            cursor = sqlite3.Cursor(conn)
+            try:
+                return [row[3] for row in cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+            finally:
+                cursor.close()
+        except sqlite3.Error:
+            # e.g. a connection already closed when the cursor was collected
+            return None
+
+    def statements(self):
+        """Per statement, slowest in total first: count, mean/max ms, rows and plan flags"""
+        with self._lock:
+            items = [(text, dict(stats)) for text, stats in self._statements.items()]
+        rows = []
+        for text, stats in items:
+            scans, indexes = plan_flags(stats['plan'] or [])
+            rows.append({
+                'sql': text,
+                'count': stats['count'],
+                'mean_ms': round(stats['total_ms'] / stats['count'], 1),
+                'max_ms': round(stats['max_ms'], 1),
+                'total_ms': round(stats['total_ms'], 1),
+                'rows': stats['rows'],
+                'full_scan': ', '.join(scans) if stats['plan'] is not None else None,
+                'indexes': ', '.join(indexes) if stats['plan'] is not None else None,
+                'plan': stats['plan'],
+            })
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def slow_queries(self):
+        """Recent statements over the threshold, newest first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's time (execute plus fetches) and row count to query_log"""
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        super().execute(sql, parameters)
+        self._started(sql, parameters, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        # No single parameter set to explain with
+        self._started(sql, None, time.perf_counter() - started)
+        return self
+
+    def _started(self, sql, params, seconds):
+        self._sql, self._params, self._seconds, self._rows = sql, params, seconds, 0
+        if self.description is None:
+            # No result rows: complete once executed
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+
+    def _fetched(self, rows, started, done):
+        if self._sql is not None:
+            self._seconds += time.perf_counter() - started
+            self._rows += rows
+            if done:
+                self._finish()
+
+    def _finish(self):
+        sql, self._sql = self._sql, None
+        if sql is not None:
+            query_log.record(self.connection, sql, self._params, self._seconds, self._rows)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(int(row is not None), started, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(len(rows), started, len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), started, True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(0, started, True)
+            raise
+        self._fetched(1, started, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Covers conn.execute(...).fetchone() and other partly read cursors
+        self._finish()
+
+
+query_log = QueryLog(float(os.environ.get('ROKU_SLOW_QUERY_MS', 200)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run each page's queries once and print their plans")
+    parser.add_argument('--db', default='mycontec.db', help="SQLite database (default: mycontec.db)")
+    args = parser.parse_args(argv)
+
+    import analytics
+    from bench import page_cases
+    from database import DatabaseManager
+
+    query_log.threshold_ms = 0
+    logging.disable(logging.WARNING)
+    db_manager = DatabaseManager(args.db)
+    summary = db_manager.get_roku_summary()
+    cases = page_cases(db_manager)
+    if not summary.empty:
+        # The raw-row paths: the Weekly Services drill-down, the paged grid and its filters
+        latest = summary['reportdate'].max()
+        month_start, month_end = analytics.month_bounds(latest.year, latest.month)
+        servicecode = str(summary['servicecode'].iloc[0])
+        cases += [
+            ('charlie.fetch_data_range', lambda: db_manager.get_roku_data_range(month_start, month_end, servicecode)),
+            ('delta.grid_page', lambda: db_manager.get_roku_page(limit=100)),
+            ('delta.grid_page[month, sorted]', lambda: db_manager.get_roku_page(
+                'reportdate', True, 100, from_date=month_start, to_date=month_end)),
+            ('delta.grid_page[servicecode]', lambda: db_manager.get_roku_page(servicecodes=[servicecode])),
+        ]
+    for _, func in cases:
+        func()
+
+    for stats in query_log.statements():
+        if stats['plan'] is None:
+            continue
+        flag = f"FULL SCAN of {stats['full_scan']}" if stats['full_scan'] else f"indexes: {stats['indexes'] or 'none'}"
+        print(f"{stats['mean_ms']:>9.1f} ms {stats['rows']:>10,} rows  {flag}")
+        print(f"    {stats['sql'][:160]}")
+        for detail in stats['plan']:
+            print(f"      {detail}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
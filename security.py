@@ -0,0 +1,236 @@
+"""Password checks off the script thread, login throttling and signed single-use session codes.
+
+bcrypt is deliberately slow, and run inline on Streamlit's script threads a
+burst of logins at shift start saturates every core and stalls other
+sessions' reruns. Hashing runs on a small process-wide thread pool instead
+(bcrypt releases the GIL while it works), so it never takes more than
+POOL_SIZE cores; once POOL_SIZE + QUEUE_LIMIT checks are in flight further
+logins are turned away as busy rather than queued without limit.
+
+A successful login issues an HMAC-signed session code that the app keeps in
+the page URL, so a browser refresh is re-authenticated with one hash
+comparison and one indexed lookup instead of another bcrypt round. Codes are
+short-lived and single-use: the server records each code's nonce, redeeming
+a code deletes it, and the app swaps in a fresh one every SESSION_ROTATE
+seconds, so a code copied out of the address bar, history or a Referer
+header soon stops working. Codes carry a fingerprint of the password hash and
+the user's session generation, which logout and password changes bump, so
+either revokes every outstanding code.
+
+Like caching.py this module is imported once per process and keeps its state
+across reruns.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+POOL_SIZE = max(1, min(4, (os.cpu_count() or 2) // 2))
+QUEUE_LIMIT = 16
+# A session code left unused this long expires; an open tab rotates its code
+# well before then
+SESSION_CODE_TTL = 30 * 60
+SESSION_ROTATE = 10 * 60
+# Failed logins allowed per window before a lockout; per address is looser
+# because a whole site may share one address
+USER_FAILURES = 5
+ADDRESS_FAILURES = 30
+FAILURE_WINDOW = 900
+LOCKOUT = 300
+
+# Tokens signed with this stay valid only in this process; set session_secret
+# in secrets.toml so every worker accepts them and they survive restarts
+_PROCESS_SECRET = secrets.token_bytes(32)
+
+
+class VerifierBusy(RuntimeError):
+    """Too many password checks already queued"""
+
+
+def _checkpw(password, stored_hash):
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+    except ValueError:
+        # Malformed stored hash
+        return False
+
+
+def hash_password(password):
+    """bcrypt hash at the default cost; module-level so process pools can pickle it"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+class PasswordVerifier:
+    def __init__(self, workers=POOL_SIZE, queue_limit=QUEUE_LIMIT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._dummy_hash = None
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise VerifierBusy("Too many logins in progress")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def verify(self, password, stored_hash):
+        """bcrypt check on the pool; raises VerifierBusy when the queue is full"""
+        return self._run(_checkpw, password, stored_hash)
+
+    def hash(self, password):
+        return self._run(hash_password, password)
+
+    def verify_unknown_user(self, password):
+        """Spend a bcrypt round as a real check would, so response time doesn't reveal unknown usernames"""
+        if self._dummy_hash is None:
+            self._dummy_hash = self._run(hash_password, secrets.token_hex(8))
+        self._run(_checkpw, password, self._dummy_hash)
+        return False
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.workers, 'in_flight': self.in_flight,
+                    'completed': self.completed, 'rejected_busy': self.rejected}
+
+
+class LoginThrottle:
+    """Failed-login counters per username and per client address, with temporary lockouts"""
+
+    def __init__(self, window=FAILURE_WINDOW, lockout=LOCKOUT):
+        self.window = window
+        self.lockout = lockout
+        self._failures = {}
+        self._locked_until = {}
+        self._lock = threading.Lock()
+
+    def _limit(self, key):
+        return ADDRESS_FAILURES if key[0] == 'address' else USER_FAILURES
+
+    def retry_after(self, keys):
+        """Seconds until any of keys may try again; 0 when none are locked out"""
+        now = time.monotonic()
+        with self._lock:
+            wait = max((self._locked_until.get(key, 0) - now for key in keys), default=0)
+        return int(wait) + 1 if wait > 0 else 0
+
+    def failure(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                attempts = self._failures.setdefault(key, deque())
+                attempts.append(now)
+                while attempts and attempts[0] < now - self.window:
+                    attempts.popleft()
+                if len(attempts) >= self._limit(key):
+                    self._locked_until[key] = now + self.lockout
+                    attempts.clear()
+            self._expire(now)
+
+    def success(self, keys):
+        with self._lock:
+            for key in keys:
+                if key[0] == 'user':
+                    # One user's success says nothing about others behind the same address
+                    self._failures.pop(key, None)
+                    self._locked_until.pop(key, None)
+
+    def _expire(self, now):
+        for key in [key for key, until in self._locked_until.items() if until <= now]:
+            del self._locked_until[key]
+        for key in [key for key, attempts in self._failures.items() if not attempts or attempts[-1] < now - self.window]:
+            del self._failures[key]
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {'tracked': len(self._failures),
+                    'locked': sum(1 for until in self._locked_until.values() if until > now)}
+
+
+def throttle_keys(username, address=None):
+    """Throttle keys for a login attempt"""
+    keys = [('user', (username or '').strip().lower())]
+    if address:
+        keys.append(('address', address))
+    return keys
+
+
+CLAIMS = ('username', 'expires', 'fingerprint', 'generation', 'nonce')
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class SessionTokens:
+    """Signed, expiring session codes: base64(payload).base64(HMAC-SHA256)
+
+    The signature only proves the server issued a code; callers must also
+    redeem its nonce against the server-side record to make it single-use.
+    """
+
+    def __init__(self, secret=None, ttl=SESSION_CODE_TTL):
+        self._key = secret.encode('utf-8') if isinstance(secret, str) else (secret or _PROCESS_SECRET)
+        self.ttl = ttl
+
+    @staticmethod
+    def fingerprint(password_hash):
+        return hashlib.sha256(password_hash.encode('utf-8')).hexdigest()[:16]
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self._key, payload, hashlib.sha256).digest())
+
+    def issue(self, username, password_hash, generation=0):
+        """(code, claims) for a new session code with a random nonce"""
+        claims = {
+            'username': username,
+            'expires': int(time.time()) + self.ttl,
+            'fingerprint': self.fingerprint(password_hash),
+            'generation': generation,
+            'nonce': secrets.token_urlsafe(16),
+        }
+        payload = json.dumps([claims[key] for key in CLAIMS], separators=(',', ':')).encode('utf-8')
+        return f'{_b64encode(payload)}.{self._sign(payload)}', claims
+
+    def validate(self, token):
+        """Claims of a genuine unexpired code, else None; never raises on malformed input"""
+        try:
+            encoded, signature = token.split('.')
+            payload = _b64decode(encoded)
+            # Bytes, since compare_digest rejects non-ASCII str
+            if not hmac.compare_digest(signature.encode('utf-8'), self._sign(payload).encode('ascii')):
+                return None
+            claims = dict(zip(CLAIMS, json.loads(payload), strict=True))
+            expired = claims['expires'] < time.time()
+        except (AttributeError, TypeError, ValueError):
+            return None
+        return None if expired else claims
+
+
+password_verifier = PasswordVerifier()
+login_throttle = LoginThrottle()
@@ -0,0 +1,301 @@
+"""Memory-mapped columnar snapshot of roku_data, written next to the database.
+
+Each published version is a directory under <db_name>.snapshot/ holding one
+.npy file per column plus manifest.json; the CURRENT file names the version
+readers should map. Numeric and date columns are saved as-is and loaded with
+mmap_mode='r', so a worker maps them instead of converting rows through
+pd.read_sql_query, and the pages are shared with every other worker through
+the OS page cache. Text and categorical columns are dictionary-encoded:
+integer codes in the column's .npy file and the distinct values, as a
+fixed-width string array, in a .values.npy sidecar, so manifest.json stays a few
+kilobytes of metadata whatever the row count. A loaded frame has the dtypes
+of the one written: categoricals come back categorical over mapped codes,
+and plain text columns as object, so callers see the same frame as from
+SQLite.
+
+A new version is written to its own directory and CURRENT is swapped to it
+with os.replace(), so a reader sees either the old version or the new one,
+never a mix. Workers keep the version they mapped until their cache reloads;
+older versions are pruned once KEEP_VERSIONS newer ones exist.
+
+The manifest records the rewrite generation and highest contec_id it was
+taken at. With the same generation, a snapshot behind the database only
+lacks appended rows, which the caller can top up rather than reload.
+
+By default every worker's DatabaseManager.get_roku_data() keeps the snapshot
+current. With several Streamlit workers, set ROKU_SNAPSHOT=shared in their
+environment and run one publisher instead; workers then map what it
+publishes rather than each reading and writing the table. Numeric, date and
+categorical columns stay shared pages; object text columns are Python
+strings, so each worker still builds its own copy of those from the mapped
+codes and dictionaries (request them only where a page needs them):
+    python snapshot.py --db mycontec.db --publish --interval 5
+To build it once ahead of a deploy and compare load times:
+    python snapshot.py --db mycontec.db
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+FORMAT_VERSION = 4
+# Versions kept on disk besides CURRENT, for workers still mapping them
+KEEP_VERSIONS = 2
+# Type tags of dictionary values stored as text; SQLite hands back ints in loosely typed columns
+TEXT, INTEGER, REAL, BOOLEAN = 0, 1, 2, 3
+
+
+def _codes_dtype(categories):
+    """The code width pandas uses for this many categories, so from_codes keeps the mapped array"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _write_dictionary(path, col, values):
+    """Save a column's distinct values as a fixed-width string array; returns their manifest entries"""
+    encoded, tags = [], []
+    for value in values:
+        if isinstance(value, (np.integer, np.floating, np.bool_)):
+            value = value.item()
+        if isinstance(value, bool):
+            tag = BOOLEAN
+        elif isinstance(value, int):
+            tag = INTEGER
+        elif isinstance(value, float):
+            tag = REAL
+        else:
+            tag = TEXT
+        encoded.append(repr(value) if tag == REAL else str(value))
+        tags.append(tag)
+    spec = {'values_file': f'{col}.values.npy'}
+    width = max(map(len, encoded), default=1) or 1
+    np.save(os.path.join(path, spec['values_file']), np.array(encoded, dtype=f'U{width}'), allow_pickle=False)
+    if any(tags):
+        spec['tags_file'] = f'{col}.tags.npy'
+        np.save(os.path.join(path, spec['tags_file']), np.array(tags, dtype=np.int8), allow_pickle=False)
+    return spec
+
+
+def _read_dictionary(path, spec):
+    """The distinct values _write_dictionary saved, as an object array"""
+    values = np.load(os.path.join(path, spec['values_file']), mmap_mode='r').astype(object)
+    if 'tags_file' in spec:
+        tags = np.load(os.path.join(path, spec['tags_file']))
+        # Only the few non-text values need converting one by one
+        for i in np.flatnonzero(tags):
+            text = values[i]
+            values[i] = int(text) if tags[i] == INTEGER else float(text) if tags[i] == REAL else text == 'True'
+    return values
+
+
+class ColumnarSnapshot:
+    def __init__(self, db_name):
+        self.directory = f'{db_name}.snapshot'
+
+    def current_version(self):
+        """Directory name of the published version, or None"""
+        try:
+            with open(os.path.join(self.directory, CURRENT)) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def read_manifest(self, version=None):
+        version = version or self.current_version()
+        if version is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, version, MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('format') == FORMAT_VERSION else None
+
+    def load(self, generation=None, columns=None):
+        """The snapshot as a DataFrame backed by memory-mapped arrays, or None if unusable.
+
+        Returns None when there is no snapshot or it was taken before rows were
+        updated or deleted; a snapshot that is only missing appended rows is
+        returned with its last_contec_id in attrs. With generation None the
+        published version is returned whatever it was taken at.
+        """
+        # A second try covers CURRENT moving on while its files were being opened
+        for _ in range(2):
+            version = self.current_version()
+            manifest = self.read_manifest(version)
+            if manifest is None or generation not in (None, manifest['rewrite_generation']):
+                return None
+            df = self._map(version, manifest, columns)
+            if df is not None:
+                return df
+        return None
+
+    def _map(self, version, manifest, columns):
+        wanted = list(columns) if columns is not None else list(manifest['columns'])
+        if any(col not in manifest['columns'] for col in wanted):
+            return None
+
+        data = {}
+        path = os.path.join(self.directory, version)
+        try:
+            for col in wanted:
+                spec = manifest['columns'][col]
+                values = np.load(os.path.join(path, spec['file']), mmap_mode='r')
+                if spec['kind'] == 'category':
+                    # Stays on the mapped codes; only the categories are private
+                    data[col] = pd.Categorical.from_codes(values, pd.Index(_read_dictionary(path, spec), dtype=object))
+                elif spec['kind'] == 'text':
+                    # Object columns are Python strings, so each worker builds its own;
+                    # codes index into the distinct values and -1 is NULL
+                    lookup = np.append(_read_dictionary(path, spec), None)
+                    data[col] = lookup[values]
+                else:
+                    data[col] = values
+        except (OSError, ValueError):
+            # Version pruned under us; the caller retries or falls back to SQLite
+            return None
+
+        # copy=False keeps each column on its memory map instead of consolidating blocks
+        df = pd.DataFrame(data, columns=wanted, copy=False)
+        df.attrs['rewrite_generation'] = manifest['rewrite_generation']
+        df.attrs['last_contec_id'] = manifest['last_contec_id']
+        df.attrs['snapshot_version'] = version
+        return df
+
+    def write(self, df, generation):
+        """Save every column of df as a new version and publish it; returns the manifest"""
+        previous = self.read_manifest()
+        sequence = previous['sequence'] + 1 if previous else 1
+        version = f'v{sequence:06d}-{uuid.uuid4().hex[:8]}'
+        path = os.path.join(self.directory, version)
+        os.makedirs(path)
+        columns = {}
+        for col in df.columns:
+            series = df[col]
+            file = f'{col}.npy'
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                spec = {'kind': 'category', **_write_dictionary(path, col, series.cat.categories)}
+                values = series.cat.codes.to_numpy()
+            elif series.dtype == object:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                spec = {'kind': 'text', **_write_dictionary(path, col, uniques)}
+                values = codes.astype(_codes_dtype(len(uniques)))
+            else:
+                spec = {'kind': 'array'}
+                values = series.to_numpy()
+            np.save(os.path.join(path, file), values, allow_pickle=False)
+            spec['file'] = file
+            columns[col] = spec
+
+        manifest = {
+            'format': FORMAT_VERSION,
+            'sequence': sequence,
+            'rewrite_generation': generation,
+            'last_contec_id': int(df['contec_id'].max()) if len(df) else 0,
+            'rows': len(df),
+            'created': time.time(),
+            'columns': columns,
+        }
+        with open(os.path.join(path, MANIFEST), 'w') as f:
+            json.dump(manifest, f)
+
+        temp_path = os.path.join(self.directory, f'{CURRENT}.{version}.tmp')
+        with open(temp_path, 'w') as f:
+            f.write(version)
+        os.replace(temp_path, os.path.join(self.directory, CURRENT))
+        self.prune()
+        return manifest
+
+    def prune(self, keep=KEEP_VERSIONS):
+        """Delete all but the current version and the `keep` newest before it"""
+        current = self.current_version()
+        versions = sorted(
+            (os.path.basename(path) for path in glob.glob(os.path.join(self.directory, 'v*'))
+             if os.path.isdir(path)), reverse=True)
+        older = [version for version in versions if version != current][keep:]
+        for version in older:
+            # Fails on Windows while a worker still maps the files; retried on the next write
+            shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
+
+    def stats(self):
+        manifest = self.read_manifest()
+        if manifest is None:
+            return {'version': None}
+        return {
+            'version': self.current_version(),
+            'rows': manifest['rows'],
+            'rewrite_generation': manifest['rewrite_generation'],
+            'age_seconds': round(time.time() - manifest['created']),
+        }
+
+
+def publish(db_manager, interval=5.0, report=print):
+    """Keep the snapshot current for workers running with ROKU_SNAPSHOT=shared.
+
+    Wakes every `interval` seconds and republishes when roku_data has changed
+    since the last check, so workers pick up new data within about one
+    interval of it landing.
+    """
+    from caching import dataset_cache
+
+    seen = None
+    while True:
+        version = dataset_cache.data_version(db_manager.db_name)
+        if version != seen:
+            seen = version
+            before = db_manager.snapshot.current_version()
+            started = time.perf_counter()
+            df = db_manager.get_roku_data()
+            published = db_manager.snapshot.current_version()
+            if published != before:
+                report(f"Published {published}: {len(df):,} rows in {time.perf_counter() - started:.1f}s")
+            del df
+        time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the roku_data snapshot and time SQLite vs snapshot loads")
+    parser.add_argument('--db', default='mycontec.db', help="SQLite database (default: mycontec.db)")
+    parser.add_argument('--publish', action='store_true',
+                        help="keep running and republish whenever the database changes")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between change checks with --publish")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseManager
+
+    # The publisher is the one process that writes, whatever ROKU_SNAPSHOT says
+    db_manager = DatabaseManager(args.db, shared_snapshot=False)
+    if args.publish:
+        print(f"Publishing {args.db} to {db_manager.snapshot.directory} (Ctrl+C to stop)")
+        try:
+            publish(db_manager, args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    started = time.perf_counter()
+    df = db_manager.get_roku_data()
+    print(f"Loaded {len(df):,} rows in {time.perf_counter() - started:.3f}s; snapshot in {db_manager.snapshot.directory}")
+
+    started = time.perf_counter()
+    mapped = db_manager.snapshot.load(df.attrs['rewrite_generation'])
+    if mapped is None:
+        print("Snapshot could not be written or read", file=sys.stderr)
+        return 1
+    print(f"Mapped {len(mapped):,} rows from {mapped.attrs['snapshot_version']} in {time.perf_counter() - started:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Synthetic roku_data tables at benchmark scale.
+
+Rows are drawn from a profile of a real extract (the bundled mycontec file by
+default): each synthetic row copies a sampled source row's servicecode, Model,
+rate, invoice_code, invoicetype and other correlated attributes, so service
+code and model cardinalities and their rate/qty mixes match production. Dates
+are spread over --start..--end; TrackingID and invoice numbers are generated
+so they stay unique as the table grows.
+
+Usage:
+    python synth.py 100k 1M --out-dir bench_data
+    python synth.py 10M --start 2021-01-01 --end 2025-12-31 --seed 7
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from database import DatabaseManager, ROKU_DATA_DDL
+from ingest import INGEST_PRAGMAS, INSERT_COLUMNS, InvoiceIngestor
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+# Copied from the sampled source row so their combinations stay realistic
+PROFILE_COLUMNS = ['designator', 'invoice_code', 'qty', 'rate', 'servicecode', 'Palletsize', 'PalletCount', 'Model',
+                   'FailureDescription', 'failurecode', 'PartDescription', 'invoicetype']
+
+
+def parse_size(text):
+    """'100k', '1M', '50M' or a plain integer"""
+    text = str(text).strip().lower().replace('_', '').replace(',', '')
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def size_label(rows):
+    """Short form used in file names: 100000 -> '100k'"""
+    for suffix, factor in (('M', 1_000_000), ('k', 1_000)):
+        if rows >= factor and rows % factor == 0:
+            return f'{rows // factor}{suffix}'
+    return str(rows)
+
+
+def load_profile(source):
+    """Normalised source rows (ISO dates, numeric qty/rate) to sample from"""
+    conn = sqlite3.connect(source)
+    try:
+        raw = pd.read_sql_query('SELECT * FROM roku_data', conn).astype(str)
+    finally:
+        conn.close()
+    rows, _, _ = InvoiceIngestor.normalise(raw)
+    if rows.empty:
+        raise ValueError(f"{source} has no usable roku_data rows")
+    profile = rows.reset_index(drop=True)
+    # Which optional identifiers are present on a source row
+    profile['has_tracking'] = profile['TrackingID'].notna()
+    profile['has_invoice'] = profile['invoice_number'].notna()
+    profile['has_testdate'] = profile['TestDate'].notna()
+    return profile
+
+
+class SyntheticGenerator:
+    def __init__(self, profile, start='2023-01-01', end='2025-12-31', seed=42, chunksize=250000):
+        self.profile = profile
+        self.start = pd.Timestamp(start)
+        self.days = (pd.Timestamp(end) - self.start).days + 1
+        self.rng = np.random.default_rng(seed)
+        self.chunksize = chunksize
+        self._columns = {col: profile[col].to_numpy(dtype=object) for col in PROFILE_COLUMNS}
+
+    def chunk(self, offset, size):
+        """size synthetic rows; offset keeps generated identifiers unique across chunks"""
+        rng = self.rng
+        picks = rng.integers(0, len(self.profile), size)
+        sample = {col: values[picks] for col, values in self._columns.items()}
+
+        # Weekday-heavy volume, like the real invoicing calendar
+        day = rng.integers(0, self.days, size)
+        dates = self.start + pd.to_timedelta(day, unit='D')
+        weekend = dates.dayofweek >= 5
+        dates = dates.where(~weekend | (rng.random(size) < 0.15), dates - pd.to_timedelta(dates.dayofweek - 4, unit='D'))
+        reportdate = dates.strftime('%Y-%m-%d').to_numpy(dtype=object)
+
+        test_lag = pd.to_timedelta(rng.integers(0, 8, size), unit='D')
+        testdate = (dates - test_lag).strftime('%Y-%m-%d').to_numpy(dtype=object)
+        testdate[~self.profile['has_testdate'].to_numpy()[picks]] = None
+
+        ids = np.arange(offset, offset + size)
+        tracking = np.char.add('1Z', np.char.zfill(ids.astype(str), 16)).astype(object)
+        tracking[~self.profile['has_tracking'].to_numpy()[picks]] = None
+        # One invoice per week, as in the extracts
+        week = (dates - pd.to_timedelta((dates.dayofweek + 1) % 7, unit='D')).strftime('%Y%m%d').to_numpy(dtype=object)
+        has_invoice = self.profile['has_invoice'].to_numpy()[picks]
+        invoice_number = np.where(has_invoice, 'INV' + week, None)
+        invoice_reference = np.where(has_invoice, 'REF' + week, None)
+
+        qty = sample['qty'].astype(np.int64)
+        rate = sample['rate'].astype(np.float64)
+        frame = pd.DataFrame({
+            'reportdate': reportdate,
+            'designator': sample['designator'],
+            'TrackingID': tracking,
+            'invoice_code': sample['invoice_code'],
+            'qty': qty,
+            'rate': rate,
+            'amount': np.round(qty * rate, 2),
+            'invoice_number': invoice_number,
+            'servicecode': sample['servicecode'],
+            'Palletsize': sample['Palletsize'],
+            'PalletCount': sample['PalletCount'],
+            'Model': sample['Model'],
+            'TestDate': testdate,
+            'FailureDescription': sample['FailureDescription'],
+            'failurecode': sample['failurecode'],
+            'PartDescription': sample['PartDescription'],
+            'invoicetype': sample['invoicetype'],
+            'Invoice_Reference': invoice_reference,
+        })
+        return frame[INSERT_COLUMNS]
+
+    def write(self, path, rows, report=print):
+        """Create path with `rows` synthetic rows and the app's full schema; returns seconds taken"""
+        started = time.perf_counter()
+        conn = sqlite3.connect(path, isolation_level=None)
+        try:
+            for pragma in INGEST_PRAGMAS:
+                conn.execute(pragma)
+            conn.execute(ROKU_DATA_DDL)
+            column_list = ', '.join(INSERT_COLUMNS)
+            placeholders = ', '.join('?' for _ in INSERT_COLUMNS)
+            insert = f'INSERT INTO roku_data ({column_list}) VALUES ({placeholders})'
+            conn.execute('BEGIN')
+            for offset in range(0, rows, self.chunksize):
+                frame = self.chunk(offset, min(self.chunksize, rows - offset))
+                frame = frame.astype(object).where(frame.notna(), None)
+                conn.executemany(insert, frame.itertuples(index=False, name=None))
+                done = offset + len(frame)
+                report(f"{path}: {done:,}/{rows:,} rows ({done / (time.perf_counter() - started):,.0f} rows/s)")
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        # Indexes, roku_summary and the admin user are built once over the loaded table
+        report(f"{path}: building indexes and roku_summary")
+        DatabaseManager(path).pool.close_all()
+        return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic roku_data databases for benchmarking")
+    parser.add_argument('sizes', nargs='+', help="row counts, e.g. 100k 1M 10M 50M")
+    parser.add_argument('--source', default='mycontec', help="real extract database to profile (default: mycontec)")
+    parser.add_argument('--out-dir', default='bench_data', help="directory for synth_<size>.db files")
+    parser.add_argument('--start', default='2023-01-01', help="first reportdate")
+    parser.add_argument('--end', default='2025-12-31', help="last reportdate")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunksize', type=int, default=250000, help="rows generated and inserted per batch")
+    parser.add_argument('--force', action='store_true', help="overwrite existing output databases")
+    args = parser.parse_args(argv)
+
+    profile = load_profile(args.source)
+    print(f"Profiled {len(profile):,} rows from {args.source}: "
+          f"{profile['servicecode'].nunique()} service codes, {profile['Model'].nunique()} models")
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    for size in args.sizes:
+        rows = parse_size(size)
+        path = os.path.join(args.out_dir, f'synth_{size_label(rows)}.db')
+        if os.path.exists(path):
+            if not args.force:
+                print(f"{path} exists, skipping (use --force to regenerate)")
+                continue
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        generator = SyntheticGenerator(profile, args.start, args.end, args.seed, args.chunksize)
+        seconds = generator.write(path, rows)
+        print(f"{path}: {rows:,} rows in {seconds:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The bundled extract: legacy MM/DD/YYYY dates, 'NaN' placeholders and text numbers
+SHIPPED_DB = os.path.join(ROOT, 'mycontec')
+
+
+@pytest.fixture
+def shipped_db(tmp_path):
+    """A private copy of the bundled database, migrated on first DatabaseManager use"""
+    path = str(tmp_path / 'mycontec.db')
+    shutil.copy(SHIPPED_DB, path)
+    return path
+
+
+@pytest.fixture
+def db_manager(shipped_db):
+    from database import DatabaseManager
+
+    return DatabaseManager(shipped_db)
@@ -0,0 +1,171 @@
+import json
+
+import pandas as pd
+import pytest
+
+import analytics
+import calendar_dim
+
+# reportdate, servicecode, Model, qty, amount, rate_sum, row_count
+ROWS = [
+    ('2025-03-01', 'SC1', 'M1', 2, 10.0, 10.0, 2),
+    ('2025-03-03', 'SC1', 'M1', 1, 5.5, 5.5, 1),
+    ('2025-03-04', 'SC2', 'M2', 3, 4.5, 4.5, 3),
+    ('2025-03-10', 'SC2', 'M1', 4, 20.0, 20.0, 4),
+    ('2025-04-01', 'SC1', 'M2', 1, 3.0, 3.0, 1),
+]
+
+
+def make_summary(rows=ROWS):
+    """A frame shaped like DatabaseManager.get_roku_summary()"""
+    df = pd.DataFrame(rows, columns=['reportdate', 'servicecode', 'Model', 'qty', 'amount', 'rate_sum', 'row_count'])
+    df['reportdate'] = pd.to_datetime(df['reportdate'])
+    df.insert(1, 'week_start', calendar_dim.lookup(df['reportdate'], ['week_start'])['week_start'])
+    df['invoice_code'] = 'ROKU'
+    for col in ('servicecode', 'Model', 'invoice_code'):
+        df[col] = df[col].astype('category')
+    return df
+
+
+@pytest.fixture
+def summary():
+    return make_summary()
+
+
+@pytest.fixture
+def march(summary):
+    return analytics.slice_summary(summary, *analytics.month_bounds(2025, 3))
+
+
+def test_slice_summary_includes_both_end_dates(summary):
+    sliced = analytics.slice_summary(summary, '2025-03-01', '2025-03-10')
+    assert sliced['reportdate'].dt.strftime('%Y-%m-%d').tolist() == ['2025-03-01', '2025-03-03', '2025-03-04',
+                                                                     '2025-03-10']
+    assert analytics.slice_summary(summary, '2025-05-01', '2025-05-31').empty
+
+
+def test_monthly_weeks_are_numbered_within_the_month(march):
+    weeks = analytics.monthly_weekly_revenue(march)
+    assert weeks['week_number'].tolist() == [1, 2, 3]
+    # 2025-03-01 is a Saturday, so the month opens with the week begun on 2025-02-23
+    assert weeks['week_start'].dt.strftime('%Y-%m-%d').tolist() == ['2025-02-23', '2025-03-02', '2025-03-09']
+    assert weeks['week_end'].dt.strftime('%Y-%m-%d').tolist() == ['2025-03-01', '2025-03-08', '2025-03-15']
+    assert weeks['total_amount'].tolist() == [10.0, 10.0, 20.0]
+    assert weeks['total_quantity'].tolist() == [2, 4, 4]
+
+
+def test_weekly_comparison_uses_calendar_week_numbers(march):
+    weeks = analytics.weekly_revenue_comparison(march)
+    assert weeks['week_number'].tolist() == [8, 9, 10]
+    assert weeks['pct_change'].tolist()[1:] == [0.0, 100.0]
+    assert pd.isna(weeks['pct_change'].iloc[0])
+
+
+def test_service_weekly_metrics(march):
+    metrics = analytics.service_weekly_metrics(march)
+    rows = [(str(row.servicecode), f'{row.WeekStart:%Y-%m-%d}', row.qty, row.amount) for row in metrics.itertuples()]
+    assert rows == [('SC1', '2025-02-23', 2, 10.0), ('SC1', '2025-03-02', 1, 5.5),
+                    ('SC2', '2025-03-02', 3, 4.5), ('SC2', '2025-03-09', 4, 20.0)]
+
+
+def test_period_totals_by_quarter(summary):
+    totals = analytics.period_totals(summary, 'Quarter')
+    rows = [(row.Quarter, str(row.servicecode), row.qty, row.amount) for row in totals.itertuples()]
+    assert rows == [(1, 'SC1', 3, 15.5), (1, 'SC2', 7, 24.5), (2, 'SC1', 1, 3.0)]
+    assert 'Quarter' not in summary.columns
+
+
+def test_model_analysis_totals_and_rankings(summary):
+    stats = analytics.model_analysis(summary)
+    assert stats['total_records'] == 11
+    assert stats['total_revenue'] == 43.0
+    assert stats['total_qty'] == 11
+    assert stats['avg_rate'] == 3.91
+    assert stats['top_amount'].to_dict() == {'M1': 35.5, 'M2': 7.5}
+    assert stats['freq_service'].to_dict() == {'SC2': 7, 'SC1': 4}
+    assert stats['model_avg_rate'].to_dict() == {'M1': 5.07, 'M2': 1.88}
+    top_week = stats['top10_weekly_model'].iloc[0]
+    assert (top_week['Year'], top_week['Week'], top_week['Model'], top_week['count']) == (2025, 10, 'M1', 4)
+
+
+def test_compute_all_pages(summary, march):
+    results = analytics.compute_all(march, 2025, 3)
+    assert set(results) == {'weekly_services', 'statistical', 'analysis', 'monthly_revenue', 'weekly_revenue'}
+    assert set(results['statistical']) == set(analytics.PERIOD_COLUMNS.values())
+    assert 'monthly_revenue' not in analytics.compute_all(summary)
+    assert analytics.compute_all(summary.iloc[:0])['analysis'] == {}
+
+
+def test_write_results_as_json(march, tmp_path):
+    written = analytics.write_results(analytics.compute_all(march, 2025, 3), str(tmp_path), 'json')
+    assert str(tmp_path / 'analysis' / 'scalars.json') in written
+    with open(tmp_path / 'analysis' / 'scalars.json') as f:
+        assert json.load(f)['total_records'] == 10
+    with open(tmp_path / 'weekly_services' / 'metrics.json') as f:
+        assert [row['servicecode'] for row in json.load(f)] == ['SC1', 'SC1', 'SC2', 'SC2']
+
+
+def weekly(*weeks):
+    """weekly_revenue_comparison-shaped rows from (week_start, total_amount) pairs"""
+    df = pd.DataFrame(weeks, columns=['week_start', 'total_amount'])
+    df['week_start'] = pd.to_datetime(df['week_start'])
+    return df
+
+
+def test_week_over_week_leaves_the_first_week_blank_without_history():
+    weeks = analytics.week_over_week(weekly(('2025-03-02', 100.0), ('2025-03-09', 150.0)))
+    assert pd.isna(weeks['prev_amount'].iloc[0]) and pd.isna(weeks['pct_change'].iloc[0])
+    assert weeks['change_amount'].iloc[1] == 50.0
+    assert weeks['pct_change'].iloc[1] == 50.0
+    empty = weekly()
+    assert analytics.week_over_week(empty) is empty
+
+
+def test_week_over_week_compares_the_first_week_with_the_previous_month():
+    # January's first week against December's last; the week spanning both months is in both frames
+    december = weekly(('2024-12-22', 80.0), ('2024-12-29', 40.0))
+    january = weekly(('2024-12-29', 40.0), ('2025-01-05', 60.0))
+    weeks = analytics.week_over_week(january, december)
+    assert len(weeks) == 2
+    assert weeks['prev_amount'].tolist() == [80.0, 40.0]
+    assert weeks['pct_change'].tolist() == [-50.0, 50.0]
+
+
+def test_week_over_week_after_a_week_with_no_revenue():
+    weeks = analytics.week_over_week(weekly(('2025-03-02', 0.0), ('2025-03-09', 25.0), ('2025-03-16', 0.0)),
+                                     weekly())
+    assert weeks['change_amount'].tolist()[1:] == [25.0, -25.0]
+    # No percentage against zero rather than an infinite one
+    assert pd.isna(weeks['pct_change'].iloc[1])
+    assert weeks['pct_change'].iloc[2] == -100.0
+
+
+def test_weekly_comparison_after_a_week_with_no_revenue():
+    summary = make_summary([('2025-03-03', 'SC1', 'M1', 1, 0.0, 0.0, 1), ('2025-03-10', 'SC1', 'M1', 1, 5.0, 5.0, 1)])
+    assert analytics.weekly_revenue_comparison(summary)['pct_change'].isna().all()
+
+
+@pytest.mark.parametrize('year, month, last_day', [(2024, 2, '2024-02-29'), (2025, 2, '2025-02-28'), (2025, 12, '2025-12-31')])
+def test_month_bounds(year, month, last_day):
+    first, last = analytics.month_bounds(year, month)
+    assert first == pd.Timestamp(year=year, month=month, day=1)
+    assert last == pd.Timestamp(last_day)
+
+
+def test_add_period_columns_takes_week_year_from_the_sunday():
+    df = analytics.add_period_columns(pd.DataFrame({'reportdate': pd.to_datetime(['2024-01-03', '2024-07-01'])}))
+    assert df[['Week', 'WeekYear', 'Month', 'Quarter', 'HalfYear', 'Year']].values.tolist() == [
+        [53, 2023, 1, 1, 1, 2024],
+        [26, 2024, 7, 3, 2, 2024],
+    ]
+
+
+def test_as_frame_flattens_indexes_and_categoricals(summary):
+    series = summary.groupby('Model', observed=True)['amount'].sum()
+    frame = analytics._as_frame(series)
+    assert frame.columns.tolist() == ['Model', 'amount']
+    assert frame['Model'].dtype == object
+    by_pair = analytics._as_frame(summary.groupby(['Model', 'servicecode'], observed=True)[['qty']].sum())
+    assert by_pair.columns.tolist() == ['Model', 'servicecode', 'qty']
+    plain = pd.DataFrame({0: [1, 2]})
+    assert analytics._as_frame(plain).columns.tolist() == ['0']
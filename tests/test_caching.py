@@ -0,0 +1,131 @@
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+
+from caching import AggregateCache, DatasetCache
+
+
+@pytest.fixture
+def db_name(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE roku_data (contec_id INTEGER PRIMARY KEY AUTOINCREMENT, x INTEGER)')
+    conn.execute('CREATE TABLE roku_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+    conn.execute("INSERT INTO roku_meta VALUES ('rewrite_generation', 0)")
+    conn.execute('CREATE TABLE other (x INTEGER)')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def frame(rows):
+    return pd.DataFrame({'x': range(rows)})
+
+
+def commit(db_name, sql):
+    conn = sqlite3.connect(db_name)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def test_hit_until_roku_data_changes(db_name):
+    cache = DatasetCache()
+    loads = []
+    loader = lambda: loads.append(1) or frame(10)
+    cache.get(db_name, 'k', loader)
+    cache.get(db_name, 'k', loader)
+    assert len(loads) == 1
+
+    commit(db_name, 'INSERT INTO roku_data (x) VALUES (1)')
+    refreshed = cache.get(db_name, 'k', loader, refresh=lambda old: frame(11))
+    assert len(refreshed) == 11 and len(loads) == 1
+    assert cache.stats()['refreshes'] == 1
+
+
+def test_bounded_by_bytes_least_recently_used_first(db_name):
+    size = int(frame(1000).memory_usage(deep=True).sum())
+    cache = DatasetCache(max_bytes=size * 2)
+    for key in ('a', 'b'):
+        cache.get(db_name, key, lambda: frame(1000))
+    cache.get(db_name, 'a', lambda: frame(1000))
+    cache.get(db_name, 'c', lambda: frame(1000))
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+    assert {key for _, key in cache._entries} == {'a', 'c'}
+
+
+def test_newest_dataset_is_kept_even_when_over_the_limit(db_name):
+    cache = DatasetCache(max_bytes=1)
+    cache.get(db_name, 'a', lambda: frame(100))
+    cache.get(db_name, 'b', lambda: frame(100))
+    assert [key for _, key in cache._entries] == ['b']
+    loads = []
+    cache.get(db_name, 'b', lambda: loads.append(1) or frame(100))
+    assert not loads
+
+
+def test_key_locks_do_not_outlive_their_callers(db_name):
+    cache = DatasetCache(max_bytes=1)
+    for key in range(100):
+        cache.get(db_name, key, lambda: frame(10))
+    cache.get(db_name, 'empty', lambda: pd.DataFrame())
+    with pytest.raises(RuntimeError):
+        cache.get(db_name, 'failing', lambda: (_ for _ in ()).throw(RuntimeError('boom')))
+    assert cache._key_locks == {}
+
+
+def test_concurrent_misses_load_once(db_name):
+    cache = DatasetCache()
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return frame(10)
+
+    threads = [threading.Thread(target=cache.get, args=(db_name, 'k', loader)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(loads) == 1
+    assert cache._key_locks == {}
+
+
+def test_aggregate_cache_refuses_oversized_results():
+    cache = AggregateCache(max_bytes=10)
+    cache.get('page', (), 1, lambda: frame(100))
+    assert cache.stats()['entries'] == 0 and cache.stats()['oversized'] == 1
+
+
+def test_commits_to_other_tables_keep_entries(db_name):
+    cache = DatasetCache()
+    loads = []
+    loader = lambda: loads.append(1) or frame(10)
+    cache.get(db_name, 'k', loader)
+    commit(db_name, 'INSERT INTO other VALUES (1)')
+    cache.get(db_name, 'k', loader)
+    assert len(loads) == 1
+    # UPDATEs and DELETEs show up through the rewrite generation
+    commit(db_name, "UPDATE roku_meta SET value = value + 1 WHERE key = 'rewrite_generation'")
+    cache.get(db_name, 'k', loader)
+    assert len(loads) == 2
+
+
+def test_session_writes_do_not_invalidate_datasets(db_manager):
+    cache = DatasetCache()
+    cache.get(db_manager.db_name, 'roku_summary', db_manager.get_roku_summary)
+    db_manager.store_session_code('nonce', 'admin', 2 ** 40)
+    db_manager.redeem_session_code('nonce', 'admin')
+    db_manager.revoke_sessions('admin')
+    cache.get(db_manager.db_name, 'roku_summary', db_manager.get_roku_summary)
+    assert cache.stats()['invalidations'] == 0 and cache.stats()['hits'] == 1
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import calendar_dim
+from database import week_start_sql
+
+
+def weeks(*days):
+    return calendar_dim.lookup(pd.Series(pd.to_datetime(list(days))), ['week_start', 'week_number', 'week_year'])
+
+
+@pytest.mark.parametrize('day, week_start, week_number, week_year', [
+    # Saturday closing the last full week of 2022
+    ('2022-12-31', '2022-12-25', 52, 2022),
+    # 2023 starts on a Sunday, which opens week 1
+    ('2023-01-01', '2023-01-01', 1, 2023),
+    # Days before 2024's first Sunday stay in the week begun on 2023-12-31
+    ('2024-01-03', '2023-12-31', 53, 2023),
+    ('2024-01-06', '2023-12-31', 53, 2023),
+    ('2024-01-07', '2024-01-07', 1, 2024),
+    ('2025-01-01', '2024-12-29', 52, 2024),
+])
+def test_weeks_spanning_new_year_keep_their_sunday_year(day, week_start, week_number, week_year):
+    row = weeks(day).iloc[0]
+    assert row['week_start'] == pd.Timestamp(week_start)
+    assert (row['week_number'], row['week_year']) == (week_number, week_year)
+
+
+def test_lookup_extends_past_the_cached_span():
+    result = weeks('1999-12-31', '2101-01-02')
+    assert result['week_start'].tolist() == [pd.Timestamp('1999-12-26'), pd.Timestamp('2101-01-02')]
+    assert result['week_year'].tolist() == [1999, 2101]
+
+
+def test_lookup_keeps_the_callers_index():
+    dates = pd.Series(pd.to_datetime(['2024-03-05 00:00', '2024-03-05 17:30']), index=[10, 20])
+    result = calendar_dim.lookup(dates, ['week_start'])
+    assert result.index.tolist() == [10, 20]
+    assert result['week_start'].nunique() == 1
+
+
+def test_sql_week_start_matches_the_calendar():
+    calendar = calendar_dim.build_calendar('2023-12-01', '2025-02-28')
+    conn = sqlite3.connect(':memory:')
+    try:
+        days = calendar.index.strftime('%Y-%m-%d').tolist()
+        sql_starts = [conn.execute(f"SELECT {week_start_sql(':day')}", {'day': day}).fetchone()[0] for day in days]
+    finally:
+        conn.close()
+    assert sql_starts == calendar['week_start'].dt.strftime('%Y-%m-%d').tolist()
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager, SCHEMA_VERSION
+
+ROW = ("INSERT INTO roku_data (reportdate, invoice_code, qty, rate, amount, servicecode, Model, invoicetype) "
+       "VALUES (?, 'C1', 2, 2.75, 5.5, 'X1', 'M1', 'Invoice')")
+
+
+@pytest.fixture
+def conn(db_manager):
+    conn = sqlite3.connect(db_manager.db_name)
+    yield conn
+    conn.close()
+
+
+def summary_row(conn, reportdate):
+    return conn.execute("SELECT week_start, qty, amount, row_count FROM roku_summary "
+                        "WHERE reportdate = ? AND servicecode = 'X1'", (reportdate,)).fetchone()
+
+
+def test_migrations_bring_the_shipped_database_up_to_date(conn):
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    legacy = conn.execute("SELECT COUNT(*) FROM roku_data WHERE reportdate LIKE '__/__/____'").fetchone()[0]
+    assert legacy == 0
+    assert conn.execute("SELECT COUNT(*) FROM roku_data WHERE typeof(qty) != 'integer'").fetchone()[0] == 0
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'roku_calendar'").fetchone() is None
+
+
+def test_migration_rewrites_non_padded_legacy_dates(shipped_db):
+    raw = sqlite3.connect(shipped_db)
+    raw.execute("INSERT INTO roku_data (reportdate, TestDate, invoice_code, qty, rate, amount, servicecode, Model, "
+                "invoicetype) VALUES ('1/6/2025', '12/5/2024', 'C1', '2', '2.75', '5.5', 'X1', 'M1', 'Invoice')")
+    raw.execute("INSERT INTO roku_data (reportdate, TestDate, invoice_code, qty, rate, amount, servicecode, Model, "
+                "invoicetype) VALUES ('11/30/2024', '3/09/2024', 'C1', '1', '2.75', '2.75', 'X1', 'M1', 'Invoice')")
+    raw.commit()
+    raw.close()
+
+    DatabaseManager(shipped_db)
+    conn = sqlite3.connect(shipped_db)
+    try:
+        dates = conn.execute("SELECT reportdate, TestDate FROM roku_data WHERE servicecode = 'X1' "
+                             "ORDER BY contec_id").fetchall()
+        assert dates == [('2025-01-06', '2024-12-05'), ('2024-11-30', '2024-03-09')]
+        assert conn.execute("SELECT COUNT(*) FROM roku_data WHERE reportdate LIKE '%/%' "
+                            "OR TestDate LIKE '%/%'").fetchone()[0] == 0
+        assert summary_row(conn, '2025-01-06') == ('2025-01-05', 2, 5.5, 1)
+    finally:
+        conn.close()
+
+
+def test_summary_backfill_matches_roku_data(conn):
+    detail = conn.execute('SELECT COUNT(*), SUM(qty), ROUND(SUM(amount), 2) FROM roku_data').fetchone()
+    summary = conn.execute('SELECT SUM(row_count), SUM(qty), ROUND(SUM(amount), 2) FROM roku_summary').fetchone()
+    assert summary == detail
+
+
+def test_summary_triggers_follow_inserts_and_deletes(conn):
+    conn.execute(ROW, ('2024-01-03',))
+    conn.commit()
+    # 2024-01-03 is a Wednesday; weeks start on Sunday
+    assert summary_row(conn, '2024-01-03') == ('2023-12-31', 2, 5.5, 1)
+    conn.execute("DELETE FROM roku_data WHERE servicecode = 'X1'")
+    conn.commit()
+    assert summary_row(conn, '2024-01-03') is None
+
+
+def test_legacy_dates_are_rejected_with_a_clear_message(conn):
+    with pytest.raises(sqlite3.IntegrityError, match='ISO-8601'):
+        conn.execute(ROW, ('01/03/2024',))
+    conn.rollback()
+    conn.execute(ROW, ('2024-01-03',))
+    with pytest.raises(sqlite3.IntegrityError, match='ISO-8601'):
+        conn.execute("UPDATE roku_data SET reportdate = '01/03/2024' WHERE servicecode = 'X1'")
+
+
+def test_money_columns_keep_their_decimal_values(db_manager, conn):
+    conn.execute(ROW.replace('2.75', '3.9'), ('2024-01-03',))
+    conn.commit()
+    df = db_manager.get_roku_data(['servicecode', 'rate', 'amount'], use_snapshot=False)
+    assert df['rate'].dtype == 'float64' and df['amount'].dtype == 'float64'
+    assert str(df.loc[df['servicecode'] == 'X1', 'rate'].iloc[0]) == '3.9'
+    rows, _ = db_manager.get_roku_page(servicecodes=['X1'])
+    assert str(rows['rate'].iloc[0]) == '3.9'
@@ -0,0 +1,27 @@
+import pyarrow.parquet as pq
+import pytest
+
+import export
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'xlsx', 'parquet'])
+def test_export_every_row_of_shipped_data(db_manager, tmp_path, fmt):
+    path = str(tmp_path / f'rows.{fmt}')
+    rows = export.export_rows(db_manager, path, fmt)
+    assert rows == 21469
+
+
+def test_parquet_types_placeholder_numbers_as_null(db_manager, tmp_path):
+    path = str(tmp_path / 'rows.parquet')
+    export.export_rows(db_manager, path, 'parquet', chunksize=5000)
+    table = pq.read_table(path)
+    assert table.num_rows == 21469
+    assert str(table.schema.field('Palletsize').type) == 'double'
+    assert str(table.schema.field('qty').type) == 'int64'
+    # Stored as the text 'NaN' in most rows of the extract
+    assert table.column('PalletCount').null_count > 20000
+
+
+def test_unknown_format_is_rejected(db_manager, tmp_path):
+    with pytest.raises(ValueError):
+        export.export_rows(db_manager, str(tmp_path / 'rows.txt'), 'txt')
@@ -0,0 +1,30 @@
+import subprocess
+
+import pytest
+
+from importtime_report import EAGER_IMPORTS, HERE, startup_imports
+
+BASELINE = '67561ab'
+
+
+def test_startup_imports_follow_roku_module_level_imports():
+    imports = startup_imports().splitlines()
+    assert 'import views' in imports
+    assert any(line.startswith('from security import') for line in imports)
+
+
+def test_imports_inside_functions_are_left_out(tmp_path):
+    path = tmp_path / 'app.py'
+    path.write_text('import os\nfrom a import (b,\n    c)\n\ndef page():\n    import plotly\n')
+    assert startup_imports(str(path)) == 'import os\nfrom a import b, c'
+
+
+def test_eager_baseline_is_the_old_roku_imports(tmp_path):
+    try:
+        source = subprocess.run(['git', 'show', f'{BASELINE}:roku.py'], cwd=HERE, capture_output=True,
+                                check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip(f'baseline commit {BASELINE} is not available')
+    path = tmp_path / 'roku.py'
+    path.write_bytes(source)
+    assert EAGER_IMPORTS.strip() == startup_imports(str(path))
@@ -0,0 +1,78 @@
+import sqlite3
+
+import pandas as pd
+
+import export
+from ingest import InvoiceIngestor, _parse_dates
+
+
+def quiet(message):
+    pass
+
+
+def test_migration_stores_placeholders_as_null(db_manager):
+    conn = sqlite3.connect(db_manager.db_name)
+    try:
+        for col in ('TrackingID', 'invoice_number', 'designator', 'Palletsize', 'PalletCount'):
+            count = conn.execute(f"SELECT COUNT(*) FROM roku_data WHERE {col} IN ('NaN', 'nan', '')").fetchone()[0]
+            assert count == 0, col
+    finally:
+        conn.close()
+
+
+def test_reingesting_an_export_only_adds_unidentifiable_rows(db_manager, tmp_path):
+    path = str(tmp_path / 'export.csv')
+    exported = export.export_rows(db_manager, path, 'csv')
+    conn = sqlite3.connect(db_manager.db_name)
+    try:
+        last_id = conn.execute('SELECT MAX(contec_id) FROM roku_data').fetchone()[0]
+        stats = InvoiceIngestor(db_manager.db_name).ingest_file(path, report=quiet)
+        # Rows with neither TrackingID nor invoice_number are always inserted; nothing else is new
+        identifiable = conn.execute(
+            'SELECT COUNT(*) FROM roku_data WHERE contec_id > ? AND (TrackingID IS NOT NULL OR invoice_number IS NOT NULL)',
+            (last_id,)).fetchone()[0]
+    finally:
+        conn.close()
+    assert stats['read'] == exported
+    assert identifiable == 0
+    assert stats['duplicates'] > 19000
+
+
+def test_lines_differing_only_in_qty_are_kept(tmp_path):
+    line = {'reportdate': '01/06/2025', 'designator': 'CT1', 'TrackingID': '1Z999', 'invoice_code': 'ROKU',
+            'qty': '2', 'rate': '3.9', 'amount': '7.8', 'invoice_number': 'INV1', 'servicecode': 'SCOMPLETE',
+            'Model': '3820XB', 'invoicetype': 'OEM'}
+    other = {**line, 'qty': '1', 'amount': '3.9'}
+    path = str(tmp_path / 'extract.csv')
+    pd.DataFrame([line, other, line]).to_csv(path, index=False)
+
+    stats = InvoiceIngestor(str(tmp_path / 'new.db')).ingest_file(path, report=quiet)
+    assert stats['inserted'] == 2
+    assert stats['duplicates'] == 1
+
+
+def test_bulk_ingest_keeps_summary_in_step(db_manager, tmp_path):
+    path = str(tmp_path / 'export.csv')
+    export.export_rows(db_manager, path, 'csv')
+    # A small commit size exercises the rollup and trigger restore between transactions
+    stats = InvoiceIngestor(db_manager.db_name, chunksize=5000, commit_rows=2000).ingest_file(path, report=quiet)
+    assert stats['inserted'] > 0
+
+    conn = sqlite3.connect(db_manager.db_name)
+    try:
+        expected = conn.execute('''
+            SELECT date(reportdate), servicecode, Model, invoice_code, SUM(qty), ROUND(SUM(amount), 2), COUNT(*)
+            FROM roku_data GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4''').fetchall()
+        summary = conn.execute('''
+            SELECT reportdate, servicecode, Model, invoice_code, qty, ROUND(amount, 2), row_count
+            FROM roku_summary ORDER BY 1, 2, 3, 4''').fetchall()
+        trigger = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'trg_roku_summary_insert'").fetchone()
+    finally:
+        conn.close()
+    assert summary == expected
+    assert trigger is not None
+
+
+def test_dates_accept_us_and_iso_forms():
+    values = pd.Series(['01/06/2025', '2025-01-07', '2025-01-08 00:00:00', None, 'soon', '01/06/2025'])
+    assert _parse_dates(values).tolist() == ['2025-01-06', '2025-01-07', '2025-01-08', None, None, '2025-01-06']
@@ -0,0 +1,42 @@
+import pytest
+
+from perf import SpanRecorder
+
+
+class Rerun(Exception):
+    pass
+
+
+def test_nested_spans_are_recorded_under_their_parent():
+    recorder = SpanRecorder()
+    with recorder.span('page:home'):
+        with recorder.span('load:roku_summary'):
+            pass
+        recorder.timed('figure')(lambda: None)()
+    spans = [row['span'] for row in recorder.summary()]
+    assert spans == ['page:home', 'page:home/figure', 'page:home/load:roku_summary']
+
+
+def test_spans_that_raise_are_not_recorded():
+    recorder = SpanRecorder()
+    with pytest.raises(Rerun):
+        with recorder.span('page:home'):
+            raise Rerun
+    with recorder.span('after'):
+        pass
+    # The failed span's path does not leak into later spans either
+    assert [row['span'] for row in recorder.summary()] == ['after']
+
+
+def test_percentiles_and_prometheus_text():
+    recorder = SpanRecorder(samples=100)
+    for ms in range(1, 101):
+        recorder.record('page:home', ms / 1000)
+    row, = recorder.summary()
+    assert (row['count'], row['p50_ms'], row['p95_ms'], row['max_ms']) == (100, 50.0, 95.0, 100.0)
+
+    recorder.record('say "hi"', 0.001)
+    text = recorder.prometheus_text()
+    assert 'roku_span_seconds_count{span="page:home",' in text
+    assert 'quantile="0.95"} 0.095000' in text
+    assert 'span="say \\"hi\\""' in text
@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.close()
+    pool = ConnectionPool(path, max_size=2, timeout=5)
+    yield pool
+    pool.close_all()
+
+
+def test_connections_use_wal_and_wait_on_locks(pool):
+    conn = pool.acquire()
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+    finally:
+        conn.close()
+
+
+def test_reader_is_not_blocked_by_an_open_write(pool):
+    writer, reader = pool.acquire(), pool.acquire()
+    try:
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute('INSERT INTO t VALUES (1)')
+        # WAL: the reader sees the last committed state instead of waiting
+        assert reader.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+        writer.commit()
+        assert reader.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_checkout_waits_for_a_release_at_max_size(pool):
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive() and not acquired
+
+    first.close()
+    waiter.join(5)
+    assert acquired == [first]
+    stats = pool.stats()
+    assert (stats['open'], stats['in_use'], stats['waits']) == (2, 2, 1)
+    second.close()
+    acquired[0].close()
+
+
+def test_checkout_times_out_when_nothing_is_released(pool):
+    pool.timeout = 0.1
+    held = [pool.acquire(), pool.acquire()]
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='No database connection available'):
+            pool.acquire()
+    finally:
+        for conn in held:
+            conn.close()
+
+
+def test_concurrent_checkouts_stay_within_max_size(pool):
+    errors = []
+
+    def work():
+        try:
+            for _ in range(25):
+                conn = pool.acquire()
+                try:
+                    conn.execute('SELECT COUNT(*) FROM t').fetchone()
+                finally:
+                    conn.close()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert errors == []
+    assert stats['acquired'] == 200
+    assert stats['open'] <= 2 and stats['peak_in_use'] <= 2
+    assert stats['in_use'] == 0
+
+
+def test_connection_returned_after_an_exception_is_rolled_back(pool):
+    with pytest.raises(RuntimeError):
+        conn = pool.acquire()
+        try:
+            conn.execute('INSERT INTO t VALUES (1)')
+            assert conn.in_transaction
+            raise RuntimeError('page failed mid-write')
+        finally:
+            conn.close()
+
+    reused = pool.acquire()
+    try:
+        assert reused is conn
+        assert not reused.in_transaction
+        assert reused.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    finally:
+        reused.close()
+    assert pool.stats()['in_use'] == 0
+
+
+def test_double_release_is_ignored(pool):
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    assert pool.stats()['idle'] == 1
+    assert pool.acquire() is conn
+    assert pool.stats()['idle'] == 0
+    conn.close()
@@ -0,0 +1,135 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from database import DatabaseManager
+
+# contec_id follows list order: reportdate, servicecode, Model, designator, TrackingID, invoice_number, qty, amount
+ROWS = [
+    ('2025-01-01', 'SC1', 'M1', 'Alpha dock', '1ZA001', 'INV-100', 1, 10.0),
+    ('2025-01-02', 'SC2', 'M1', 'Beta dock', '1ZB002', None, 2, 5.0),
+    ('2025-01-02', 'SC1', 'M2', None, None, 'INV-ALPHA', 2, 7.5),
+    ('2025-01-05', 'SC2', 'M2', 'Gamma', '1ZC003', 'INV-101', 3, 5.0),
+    ('2025-01-31', 'SC1', 'M1', 'Delta', '1ZD004', None, 1, 12.0),
+    ('2025-02-01', 'SC3', 'M3', 'Epsilon', '1ZE005', 'INV-102', 4, 1.0),
+]
+
+
+@pytest.fixture
+def small_db(tmp_path):
+    """A fresh database holding only ROWS"""
+    manager = DatabaseManager(str(tmp_path / 'small.db'))
+    conn = sqlite3.connect(manager.db_name)
+    conn.executemany(
+        "INSERT INTO roku_data (reportdate, servicecode, Model, designator, TrackingID, invoice_number, qty, "
+        "amount, rate, invoice_code, invoicetype) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1.0, 'ROKU', 'OEM')", ROWS)
+    conn.commit()
+    conn.close()
+    return manager
+
+
+def ids(df):
+    return df['contec_id'].tolist()
+
+
+def test_pages_cover_every_row_once(small_db):
+    pages = [small_db.get_roku_page(limit=2, offset=offset) for offset in (0, 2, 4)]
+    assert [ids(df) for df, _ in pages] == [[1, 2], [3, 4], [5, 6]]
+    assert {total for _, total in pages} == {6}
+
+
+@pytest.mark.parametrize('limit, offset, expected', [(4, 4, [5, 6]), (2, 6, []), (2, 100, []), (0, 0, [])])
+def test_page_bounds(small_db, limit, offset, expected):
+    df, total = small_db.get_roku_page(limit=limit, offset=offset)
+    assert ids(df) == expected
+    assert total == 6
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_ties_are_broken_by_contec_id(small_db, descending):
+    # amount 5.0 appears twice; paging one row at a time must neither repeat nor skip either
+    pages = [ids(small_db.get_roku_page('amount', descending, limit=1, offset=offset)[0]) for offset in range(6)]
+    order = [row[0] for row in pages]
+    expected = [6, 2, 4, 3, 1, 5] if not descending else [5, 1, 3, 2, 4, 6]
+    assert order == expected
+
+
+def test_unknown_sort_column_is_rejected(small_db):
+    with pytest.raises(ValueError):
+        small_db.get_roku_page(sort_by='amount; DROP TABLE roku_data')
+
+
+@pytest.mark.parametrize('filters, expected', [
+    ({'servicecodes': ['SC1']}, [1, 3, 5]),
+    ({'servicecodes': ['SC1', 'SC2'], 'models': ['M2']}, [3, 4]),
+    ({'from_date': '2025-01-02', 'to_date': '2025-01-05'}, [2, 3, 4]),
+    ({'from_date': '2025-01-01', 'to_date': '2025-01-31', 'models': ['M1']}, [1, 2, 5]),
+    ({'servicecodes': []}, [1, 2, 3, 4, 5, 6]),
+    ({'models': ['M9']}, []),
+])
+def test_filters_combine(small_db, filters, expected):
+    df, total = small_db.get_roku_page(**filters)
+    assert ids(df) == expected
+    assert total == len(expected)
+
+
+@pytest.mark.parametrize('search, expected', [
+    # designator and invoice_number, case-insensitively
+    ('alpha', [1, 3]),
+    ('1ZC', [4]),
+    ('INV-10', [1, 4, 6]),
+    ('nothing like it', []),
+])
+def test_search_matches_designator_tracking_and_invoice(small_db, search, expected):
+    df, total = small_db.get_roku_page(search=search)
+    assert ids(df) == expected
+    assert total == len(expected)
+
+
+def test_sort_filter_and_page_together(small_db):
+    filters = {'from_date': '2025-01-01', 'to_date': '2025-01-31', 'search': 'INV'}
+    first, total = small_db.get_roku_page('amount', True, limit=2, offset=0, **filters)
+    rest, _ = small_db.get_roku_page('amount', True, limit=2, offset=2, **filters)
+    assert total == 3
+    assert ids(first) == [1, 3]
+    assert ids(rest) == [4]
+    assert first['amount'].tolist() == [10.0, 7.5]
+
+
+def test_export_iterator_uses_the_same_filters(small_db):
+    chunks = list(small_db.iter_roku_rows('qty', True, chunksize=2, servicecodes=['SC1', 'SC2']))
+    assert [ids(chunk) for chunk in chunks] == [[4, 2], [3, 1], [5]]
+
+
+@pytest.mark.parametrize('from_date, to_date, expected', [
+    # Both end dates are included
+    ('2025-01-02', '2025-01-05', [2, 3, 4]),
+    ('2025-01-31', '2025-02-01', [5, 6]),
+    ('2025-01-02', '2025-01-02', [2, 3]),
+    # A gap in the data, a range before it starts, and a reversed range
+    ('2025-01-06', '2025-01-30', []),
+    ('2024-12-01', '2024-12-31', []),
+    ('2025-01-05', '2025-01-02', []),
+])
+def test_range_bounds_are_inclusive(small_db, from_date, to_date, expected):
+    df = small_db.get_roku_data_range(from_date, to_date)
+    assert sorted(ids(df)) == expected
+
+
+def test_range_accepts_timestamps_and_rows_with_a_time(small_db):
+    conn = sqlite3.connect(small_db.db_name)
+    conn.execute("INSERT INTO roku_data (reportdate, servicecode, Model, qty, amount, rate, invoice_code, invoicetype) "
+                 "VALUES ('2025-01-05 23:59:59', 'SC2', 'M2', 1, 1.0, 1.0, 'ROKU', 'OEM')")
+    conn.commit()
+    conn.close()
+    df = small_db.get_roku_data_range(pd.Timestamp('2025-01-05 12:00'), pd.Timestamp('2025-01-05'))
+    assert sorted(ids(df)) == [4, 7]
+
+
+def test_range_with_servicecode_and_columns(small_db):
+    df = small_db.get_roku_data_range('2025-01-01', '2025-01-31', servicecode='SC2', columns=['contec_id', 'amount'])
+    assert ids(df) == [2, 4]
+    assert 'Model' not in df.columns
+    empty = small_db.get_roku_data_range('2025-01-01', '2025-01-31', servicecode='SC9')
+    assert empty.empty and 'reportdate' in empty.columns
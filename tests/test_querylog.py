@@ -0,0 +1,35 @@
+import logging
+import sqlite3
+
+from querylog import QueryLog, plan_flags
+
+
+def test_slow_query_is_recorded_with_its_plan():
+    log = QueryLog(threshold_ms=0)
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE roku_data (contec_id INTEGER PRIMARY KEY, qty INTEGER)')
+    log.record(conn, 'SELECT qty FROM roku_data', (), 0.5, 0)
+    log.record(conn, 'SELECT qty FROM roku_data WHERE contec_id = ?', (1,), 0.5, 1)
+    slow = {entry['sql']: entry for entry in log.slow_queries()}
+    assert slow['SELECT qty FROM roku_data']['full_scan'] == 'roku_data'
+    assert slow['SELECT qty FROM roku_data WHERE contec_id = ?']['indexes'] == 'INTEGER PRIMARY KEY'
+    conn.close()
+
+
+def test_plan_flags_treat_index_order_scans_as_full_scans():
+    scans, indexes = plan_flags(['SCAN roku_data USING INDEX idx_reportdate'])
+    assert scans == ['roku_data']
+    assert indexes == ['idx_reportdate']
+
+
+def test_slow_query_warnings_stay_off_stderr_without_logging_config(capsys, monkeypatch):
+    # What a command-line tool sees: no handlers on the root logger
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+    QueryLog(threshold_ms=0).record(sqlite3.connect(':memory:'), 'SELECT 1', (), 0.5, 1)
+    assert capsys.readouterr().err == ''
+
+
+def test_slow_query_warnings_reach_configured_handlers(caplog):
+    with caplog.at_level(logging.WARNING, logger='roku.sql'):
+        QueryLog(threshold_ms=0).record(sqlite3.connect(':memory:'), 'SELECT 1', (), 0.5, 1)
+    assert 'SELECT 1' in caplog.text
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from security import SessionTokens, _b64encode
+
+HASH = '$2b$12$abcdefghijklmnopqrstuuKzVd0Wl0n2mF1Tq8pQ6s3b4c5d6e7f8'
+
+
+def test_issued_code_validates():
+    tokens = SessionTokens('secret')
+    code, claims = tokens.issue('alice', HASH, generation=3)
+    assert tokens.validate(code) == claims
+    assert claims['username'] == 'alice'
+    assert claims['generation'] == 3
+    assert claims['fingerprint'] == SessionTokens.fingerprint(HASH)
+
+
+def test_code_signed_with_another_secret_is_rejected():
+    code, _ = SessionTokens('secret').issue('alice', HASH)
+    assert SessionTokens('other').validate(code) is None
+
+
+def test_tampered_payload_is_rejected():
+    tokens = SessionTokens('secret')
+    code, _ = tokens.issue('alice', HASH)
+    forged, _ = tokens.issue('admin', HASH)
+    assert tokens.validate(forged.split('.')[0] + '.' + code.split('.')[1]) is None
+
+
+def test_expired_code_is_rejected():
+    tokens = SessionTokens('secret', ttl=-1)
+    code, _ = tokens.issue('alice', HASH)
+    assert tokens.validate(code) is None
+
+
+@pytest.mark.parametrize('code', [
+    None, '', 'abc', 'a.b.c', 'YQ.é', 'é.é', '!!!.???', 'YQ.' + 'A' * 43, '\x00.\x00',
+])
+def test_malformed_codes_are_rejected_without_raising(code):
+    assert SessionTokens('secret').validate(code) is None
+
+
+def test_signed_payload_of_the_wrong_shape_is_rejected():
+    tokens = SessionTokens('secret')
+    for payload in (b'1', b'[1,2]', b'["a","soon","f",0,"n"]', b'\xff'):
+        assert tokens.validate(f'{_b64encode(payload)}.{tokens._sign(payload)}') is None
+
+
+def test_session_code_redeems_once(db_manager):
+    code, claims = SessionTokens('secret').issue('admin', HASH)
+    db_manager.store_session_code(claims['nonce'], 'admin', claims['expires'])
+    assert db_manager.redeem_session_code(claims['nonce'], 'admin')
+    assert not db_manager.redeem_session_code(claims['nonce'], 'admin')
+
+
+def test_session_code_is_bound_to_its_user(db_manager):
+    db_manager.store_session_code('nonce', 'admin', int(time.time()) + 60)
+    assert not db_manager.redeem_session_code('nonce', 'someone')
+    assert db_manager.redeem_session_code('nonce', 'admin')
+
+
+def test_expired_session_code_cannot_be_redeemed(db_manager):
+    db_manager.store_session_code('old', 'admin', int(time.time()) - 1)
+    assert not db_manager.redeem_session_code('old', 'admin')
+
+
+def test_rotation_retires_the_replaced_code(db_manager):
+    expires = int(time.time()) + 60
+    db_manager.store_session_code('first', 'admin', expires)
+    db_manager.store_session_code('second', 'admin', expires, replaces='first')
+    assert not db_manager.redeem_session_code('first', 'admin')
+    assert db_manager.redeem_session_code('second', 'admin')
+
+
+def test_revoking_sessions_bumps_generation_and_drops_codes(db_manager):
+    conn = db_manager.get_connection()
+    try:
+        generation = lambda: conn.execute("SELECT session_generation FROM users WHERE username = 'admin'").fetchone()[0]
+        before = generation()
+        db_manager.store_session_code('live', 'admin', int(time.time()) + 60)
+        db_manager.revoke_sessions('admin')
+        assert generation() == before + 1
+    finally:
+        conn.close()
+    assert not db_manager.redeem_session_code('live', 'admin')
@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import warnings
+
+import pandas as pd
+import pytest
+
+from database import DatabaseManager
+
+COLUMNS = ['reportdate', 'servicecode', 'TrackingID', 'Palletsize', 'qty', 'amount']
+
+
+def insert_row(db_name):
+    conn = sqlite3.connect(db_name)
+    try:
+        conn.execute("INSERT INTO roku_data (reportdate, invoice_code, qty, rate, amount, servicecode, Model, invoicetype) "
+                     "VALUES ('2024-01-02', 'C1', 2, 2.75, 5.5, 'X1', 'M1', 'Invoice')")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def assert_same_frame(left, right):
+    # Mapped columns are np.memmap, an ndarray subclass the exact comparison would reject
+    pd.testing.assert_frame_equal(left, right, check_exact=False, rtol=0, atol=0)
+
+
+def test_snapshot_load_matches_sqlite_dtypes(db_manager):
+    from_sql = db_manager.get_roku_data(use_snapshot=False)
+    assert not os.path.exists(db_manager.snapshot.directory)
+
+    db_manager.get_roku_data()
+    mapped = db_manager.get_roku_data()
+    assert 'snapshot_version' in mapped.attrs
+    pd.testing.assert_series_equal(mapped.dtypes, from_sql.dtypes)
+    assert_same_frame(mapped, from_sql)
+
+
+def test_projection_reads_only_requested_columns(db_manager):
+    df = db_manager.get_roku_data(COLUMNS)
+    assert list(df.columns) == COLUMNS
+    assert df.attrs['last_contec_id'] > 0
+    # A projected read is not a complete copy of the table to publish
+    assert db_manager.snapshot.current_version() is None
+
+    full = db_manager.get_roku_data()
+    mapped = db_manager.get_roku_data(COLUMNS)
+    assert 'snapshot_version' in mapped.attrs
+    assert_same_frame(mapped, df)
+    assert_same_frame(df, full[COLUMNS])
+
+
+def test_projected_frame_is_topped_up_with_appended_rows(db_manager):
+    df = db_manager.get_roku_data(COLUMNS)
+    insert_row(db_manager.db_name)
+    with warnings.catch_warnings():
+        # The new row's all-NULL TrackingID and Palletsize must not lean on deprecated concat behaviour
+        warnings.simplefilter('error', FutureWarning)
+        topped_up = db_manager.append_new_roku_rows(df, COLUMNS)
+    assert len(topped_up) == len(df) + 1
+    assert topped_up['TrackingID'].dtype == df['TrackingID'].dtype
+    assert topped_up['Palletsize'].dtype == df['Palletsize'].dtype
+    assert list(topped_up.columns) == COLUMNS
+    assert topped_up['qty'].iloc[-1] == 2
+
+
+def test_topped_up_frame_has_the_dtypes_of_a_full_reload(db_manager):
+    df = db_manager.get_roku_data(use_snapshot=False)
+    insert_row(db_manager.db_name)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        topped_up = db_manager.append_new_roku_rows(df)
+    reloaded = db_manager.get_roku_data(use_snapshot=False)
+    # Categories are appended rather than re-sorted, so compare the other columns
+    plain = [col for col in reloaded.columns if not isinstance(reloaded[col].dtype, pd.CategoricalDtype)]
+    pd.testing.assert_series_equal(topped_up[plain].dtypes, reloaded[plain].dtypes)
+
+
+def test_shared_workers_map_the_published_snapshot(shipped_db):
+    publisher = DatabaseManager(shipped_db, shared_snapshot=False)
+    worker = DatabaseManager(shipped_db, shared_snapshot=True)
+    # Nothing published yet: the worker reads SQLite and does not write a version itself
+    assert 'snapshot_version' not in worker.get_roku_data().attrs
+    assert worker.snapshot.current_version() is None
+
+    published = publisher.get_roku_data()
+    mapped = worker.get_roku_data()
+    assert mapped.attrs['snapshot_version'] == publisher.snapshot.current_version()
+    assert_same_frame(mapped, published)
+
+
+def test_cached_shared_load_follows_the_next_published_version(shipped_db):
+    from caching import DatasetCache
+
+    publisher = DatabaseManager(shipped_db, shared_snapshot=False)
+    worker = DatabaseManager(shipped_db, shared_snapshot=True)
+    cache = DatasetCache()
+
+    def load():
+        # As DataLoader.load_data does in shared mode
+        return cache.get(shipped_db, ('roku_data', None), worker.get_roku_data,
+                         source_version=worker.snapshot_version)
+
+    publisher.get_roku_data()
+    assert len(load()) == 21469
+    # The worker reruns after the commit but before the publisher's next pass
+    insert_row(shipped_db)
+    assert len(load()) == 21469
+    publisher.get_roku_data()
+    assert len(load()) == 21470
+    assert len(load()) == 21470
+    assert cache.stats()['hits'] == 1
+
+
+def test_publishing_prunes_old_versions(db_manager):
+    df = db_manager.get_roku_data(use_snapshot=False)
+    for _ in range(4):
+        db_manager.snapshot.write(df, df.attrs['rewrite_generation'])
+    kept = [name for name in os.listdir(db_manager.snapshot.directory) if name.startswith('v')]
+    # CURRENT and the KEEP_VERSIONS before it
+    assert len(kept) == 3
+    assert db_manager.snapshot.current_version() in kept
+
+
+class Stop(Exception):
+    pass
+
+
+def test_publisher_republishes_only_after_a_commit(shipped_db, monkeypatch):
+    import snapshot
+
+    publisher = DatabaseManager(shipped_db, shared_snapshot=False)
+    reports, ticks = [], []
+
+    def sleep(interval):
+        ticks.append(interval)
+        if len(ticks) == 2:
+            insert_row(shipped_db)
+        if len(ticks) == 4:
+            raise Stop
+
+    monkeypatch.setattr(snapshot.time, 'sleep', sleep)
+    with pytest.raises(Stop):
+        snapshot.publish(publisher, interval=0, report=reports.append)
+    # The first pass publishes, an idle pass does not, the insert is topped up and republished
+    assert len(reports) == 2
+    manifest = publisher.snapshot.read_manifest()
+    assert manifest['rows'] == 21470
+    worker = DatabaseManager(shipped_db, shared_snapshot=True)
+    assert len(worker.get_roku_data()) == 21470
+
+
+def test_dictionaries_live_beside_the_manifest_and_keep_value_types(tmp_path):
+    from snapshot import ColumnarSnapshot
+
+    df = pd.DataFrame({
+        'contec_id': [1, 2, 3, 4],
+        'TrackingID': ['1Z01', 'Zürich', None, ''],
+        'Palletsize': [1200, '1,200', None, 2.5],
+        'servicecode': pd.Categorical(['A', 'B', 'A', 'B']),
+    })
+    snapshot = ColumnarSnapshot(str(tmp_path / 'db'))
+    manifest = snapshot.write(df, 0)
+    assert all('values' not in spec for spec in manifest['columns'].values())
+    assert_same_frame(snapshot.load(), df)
+    assert snapshot.stats()['rows'] == 4
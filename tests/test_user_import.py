@@ -0,0 +1,48 @@
+import io
+
+import bcrypt
+import pytest
+
+from user_import import check_users, import_users, read_users
+
+CSV = '''Username,Password,is_admin
+alice,secret1,0
+bob,secret2,yes
+,nopassword,0
+alice,again,0
+carol,secret3,maybe
+admin,secret4,0
+'''
+
+
+def test_missing_required_column_is_rejected():
+    with pytest.raises(ValueError, match='password'):
+        read_users(io.StringIO('username,is_admin\nalice,0\n'))
+
+
+def test_rows_are_checked_with_their_line_numbers():
+    rows = read_users(io.BytesIO(('\ufeff' + CSV).encode('utf-8')))
+    users, errors = check_users(rows, existing={'admin'}, allow_admin=False)
+    assert [user[1] for user in users] == ['alice']
+    assert [(line, message.split()[0]) for line, _, message in errors] == [
+        (3, 'Only'), (4, 'Username'), (5, 'Username'), (6, 'Invalid'), (7, 'Username')]
+
+
+def test_import_creates_valid_users_with_working_hashes(db_manager):
+    result = import_users(db_manager, io.StringIO(CSV), workers=1)
+    assert result['rows'] == 6 and result['created'] == 2
+    assert len(result['errors']) == 4
+    conn = db_manager.get_connection()
+    try:
+        stored = dict(conn.execute("SELECT username, password_hash FROM users WHERE username IN ('alice', 'bob')"))
+        is_admin = conn.execute("SELECT is_admin FROM users WHERE username = 'bob'").fetchone()[0]
+    finally:
+        conn.close()
+    assert bcrypt.checkpw(b'secret1', stored['alice'].encode('utf-8'))
+    assert bcrypt.checkpw(b'secret2', stored['bob'].encode('utf-8'))
+    assert is_admin == 1
+
+
+def test_dry_run_creates_nothing(db_manager):
+    result = import_users(db_manager, io.StringIO(CSV), dry_run=True)
+    assert result['created'] == 0 and result['hash_seconds'] == 0.0
@@ -0,0 +1,162 @@
+"""Bulk creation of app users from a CSV file.
+
+The CSV needs username and password columns; is_admin and is_superadmin are
+optional (1/0, true/false, yes/no). Every row is checked first, the valid
+passwords are hashed across a process pool, and all new users are inserted
+in one transaction, so onboarding a site costs one bcrypt round per core at
+a time and a single commit. Rows that fail a check are reported with their
+line number and skipped; the rest are still created.
+
+Usage:
+    python user_import.py technicians.csv --db mycontec.db --workers 4
+"""
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from database import DatabaseManager
+from security import hash_password
+
+REQUIRED_COLUMNS = ['username', 'password']
+FLAG_COLUMNS = ['is_admin', 'is_superadmin']
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n'}
+
+
+def read_users(source):
+    """(line, row) pairs from a CSV path, text or binary file; raises ValueError on a bad header"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            return read_users(f)
+    if isinstance(source.read(0), bytes):
+        source = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(source)
+    fields = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [col for col in REQUIRED_COLUMNS if col not in fields]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    reader.fieldnames = fields
+    # Line 1 is the header
+    return [(line, row) for line, row in enumerate(reader, start=2)]
+
+
+def _flag(value):
+    value = (value or '').strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"expected 1/0, true/false or yes/no, got {value!r}")
+
+
+def check_users(rows, existing, allow_admin=False):
+    """Split rows into valid users and (line, username, message) errors"""
+    users, errors, seen = [], [], set()
+    for line, row in rows:
+        username = (row.get('username') or '').strip()
+        password = row.get('password') or ''
+        if not username or not password:
+            errors.append((line, username, "Username and password are required"))
+            continue
+        if username in existing:
+            errors.append((line, username, "Username already exists"))
+            continue
+        if username in seen:
+            errors.append((line, username, "Username appears earlier in the file"))
+            continue
+        try:
+            is_admin, is_superadmin = (_flag(row.get(col)) for col in FLAG_COLUMNS)
+        except ValueError as e:
+            errors.append((line, username, f"Invalid role flag: {e}"))
+            continue
+        if (is_admin or is_superadmin) and not allow_admin:
+            errors.append((line, username, "Only a super admin can create admin users"))
+            continue
+        seen.add(username)
+        users.append((line, username, password, is_admin or is_superadmin, is_superadmin))
+    return users, errors
+
+
+def _usernames(conn):
+    return {row[0] for row in conn.execute('SELECT username FROM users')}
+
+
+def import_users(db_manager, source, allow_admin=True, workers=None, dry_run=False):
+    """Create the valid users in source; returns counts, timings and per-row errors"""
+    started = time.perf_counter()
+    rows = read_users(source)
+    conn = db_manager.get_connection()
+    try:
+        existing = _usernames(conn)
+    finally:
+        conn.close()
+    users, errors = check_users(rows, existing, allow_admin)
+
+    result = {'rows': len(rows), 'created': 0, 'errors': errors, 'hash_seconds': 0.0}
+    if users and not dry_run:
+        hash_started = time.perf_counter()
+        workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        # spawn: forking a multi-threaded Streamlit server is not safe
+        with ProcessPoolExecutor(max_workers=min(workers, len(users)),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            hashes = list(executor.map(hash_password, [user[2] for user in users], chunksize=8))
+        result['hash_seconds'] = round(time.perf_counter() - hash_started, 2)
+
+        conn = db_manager.get_connection()
+        try:
+            # Users added while hashing are re-checked under the write lock
+            conn.execute('BEGIN IMMEDIATE')
+            existing = _usernames(conn)
+            inserts = []
+            for (line, username, _, is_admin, is_superadmin), password_hash in zip(users, hashes):
+                if username in existing:
+                    errors.append((line, username, "Username already exists"))
+                else:
+                    inserts.append((username, password_hash, int(is_admin), int(is_superadmin)))
+            conn.executemany('INSERT INTO users (username, password_hash, is_admin, is_superadmin) VALUES (?, ?, ?, ?)',
+                             inserts)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        result['created'] = len(inserts)
+
+    errors.sort()
+    result['seconds'] = round(time.perf_counter() - started, 2)
+    result['users_per_second'] = round(len(users) / result['hash_seconds'], 1) if result['hash_seconds'] else None
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create app users in bulk from a CSV file")
+    parser.add_argument('csv', help="CSV with username, password and optional is_admin, is_superadmin columns")
+    parser.add_argument('--db', default='mycontec.db', help="SQLite database (default: mycontec.db)")
+    parser.add_argument('--workers', type=int, help="hashing processes (default: one less than the CPU count)")
+    parser.add_argument('--dry-run', action='store_true', help="check the file and report errors without creating users")
+    args = parser.parse_args(argv)
+
+    try:
+        result = import_users(DatabaseManager(args.db), args.csv, workers=args.workers, dry_run=args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"{args.csv}: {e}", file=sys.stderr)
+        return 1
+
+    for line, username, message in result['errors']:
+        print(f"{args.csv}:{line}: {username or '(blank)'}: {message}", file=sys.stderr)
+    rate = f", {result['users_per_second']} hashes/s" if result['users_per_second'] else ''
+    verb = "would be created" if args.dry_run else "created"
+    valid = result['rows'] - len(result['errors']) if args.dry_run else result['created']
+    print(f"{valid:,} of {result['rows']:,} users {verb} in {result['seconds']:.1f}s{rate}; "
+          f"{len(result['errors']):,} rows rejected")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
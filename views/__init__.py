@@ -0,0 +1,20 @@
+"""Page modules for the Contec app.
+
+Each page lives in its own module and imports its plotting/grid libraries at
+module level, so a worker only pays for plotly, matplotlib or st_aggrid when
+a page that needs them is first opened. Python caches the module afterwards,
+so later reruns cost nothing extra.
+"""
+import importlib
+
+import perf
+
+PAGES = ('home', 'monthly_revenue', 'weekly_revenue', 'weekly_services', 'statistical', 'analysis')
+
+
+def render(page, app):
+    """Import views.<page> on first use and render it against the ContecApp instance, timed as page:<page>"""
+    if page not in PAGES:
+        raise ValueError(f"Unknown page: {page}")
+    with perf.span(f'page:{page}'):
+        importlib.import_module(f'{__name__}.{page}').render(app)
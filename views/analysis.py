@@ -0,0 +1,312 @@
+"""Analysis page: model, servicecode and trend statistics over the whole dataset."""
+import matplotlib.pyplot as plt
+import streamlit as st
+from st_aggrid import GridOptionsBuilder, AgGrid
+
+import analytics
+import perf
+
+# Timed as a 'grid' span: AgGrid serialises the whole frame to the browser
+AgGrid = perf.timed('grid')(AgGrid)
+
+
+def render(app):
+    #st.markdown(
+    #    '<p style="font-family:sans-serif;text-align:center; color:#3bc0f5; font-size: 30px;">📊ANALYSIS ON ROKU DATA📊</p>',
+    #    unsafe_allow_html=True
+    #)
+    #st.divider()
+    
+    def fetch_roku_data():
+        # Every statistic on this page is a rollup of roku_summary
+        return app.fetch_summary()
+
+    # Fetch data
+    with st.spinner("Loading data..."):
+        df = fetch_roku_data()
+        
+    if df is not None and not df.empty:
+        try:
+            analysis = app.aggregate('echo', (), lambda: analytics.model_analysis(df))
+        except Exception as e:
+            st.error(f"Error processing data: {e}")
+        else:
+            required_cols = ['reportdate', 'servicecode', 'Model', 'qty', 'amount', 'rate_sum', 'row_count']
+            if not all(col in df.columns for col in required_cols):
+                st.error(f"❌ Data file must contain these columns: {', '.join(required_cols)}")
+                st.divider()
+            else:
+                # Display data summary
+                st.subheader("📌Analysis on Roku Dataset - 2025")
+                col_summary1, col_summary2,col_summary3 = st.columns(3)
+                with col_summary1:
+                    st.metric("Total Records", analysis['total_records'])
+                with col_summary3:
+                    st.metric("Total Revenue", f"${analysis['total_revenue']:,.2f}")
+                with col_summary2:
+                    st.metric("Total Quantity", f"{analysis['total_qty']:,}")
+                st.divider()
+                    
+                # Tabs layout
+                tab1, tab2, tab3 = st.tabs(["📌 Summary", "📈 Trend Analysis", "📅 Time-based Insights"])
+                st.divider()
+
+                with tab1:
+                    st.subheader("📌 High & Low Revenue Models")
+                        
+                    # Calculate metrics
+                    total_revenue = analysis['total_revenue']
+                    total_qty = analysis['total_qty']
+                    avg_rate = analysis['avg_rate']
+                        
+                    # Create metric columns
+                    col_metrics1, col_metrics2, col_metrics3 = st.columns(3)
+                    with col_metrics3:
+                        st.metric("Total Revenue", f"${total_revenue:,.2f}")
+                    with col_metrics2:
+                        st.metric("Total Quantity", f"{total_qty:,}")
+                    with col_metrics1:
+                        st.metric("Average Rate", f"${avg_rate:,.2f}")
+                        st.divider()
+
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        # Highest 3 Models by Quantity
+                        top_qty = analysis['top_qty']
+                        st.write("#### 🔼 Highest 3 Models by Quantity")
+                        
+                        # Configure AgGrid
+                        gb_qty = GridOptionsBuilder.from_dataframe(
+                            top_qty.reset_index().rename(columns={'qty': 'Total Quantity'})
+                        )
+                        gb_qty.configure_column("Model", headerName="Model", width=150)
+                        gb_qty.configure_column("Total Quantity", 
+                                            headerName="Total Quantity", 
+                                            type=["numericColumn", "numberColumnFilter"],
+                                            width=120)
+                        gb_qty.configure_default_column(
+                            resizable=True,
+                            filterable=True,
+                            sortable=True,
+                            editable=False
+                        )
+                        grid_options_qty = gb_qty.build()
+                        
+                        AgGrid(
+                            top_qty.reset_index().rename(columns={'qty': 'Total Quantity'}),
+                            gridOptions=grid_options_qty,
+                            height=120,
+                            theme='streamlit',
+                            fit_columns_on_grid_load=True
+                        )
+                        
+                        # Highest 3 Models by Revenue
+                        top_amount = analysis['top_amount']
+                        st.write("#### 🔼 Highest 3 Models by Revenue")
+                        
+                        # Configure AgGrid
+                        gb_amount = GridOptionsBuilder.from_dataframe(
+                            top_amount.reset_index().rename(columns={'amount': 'Total Revenue ($)'})
+                        )
+                        gb_amount.configure_column("Model", headerName="Model", width=150)
+                        gb_amount.configure_column("Total Revenue ($)",
+                                                headerName="Total Revenue ($)",
+                                                type=["numericColumn", "numberColumnFilter"],
+                                                width=150,
+                                                valueFormatter="value.toLocaleString('en-US', {style: 'currency', currency: 'USD', minimumFractionDigits: 2})")
+                        gb_amount.configure_default_column(
+                            resizable=True,
+                            filterable=True,
+                            sortable=True,
+                            editable=False
+                        )
+                        grid_options_amount = gb_amount.build()
+                        
+                        AgGrid(
+                            top_amount.reset_index().rename(columns={'amount': 'Total Revenue ($)'}),
+                            gridOptions=grid_options_amount,
+                            height=120,
+                            theme='streamlit',
+                            fit_columns_on_grid_load=True
+                        )
+                    
+                                                     
+                    with col2:
+                        # Least 3 Models by Quantity
+                        bottom_qty = analysis['bottom_qty']
+                        st.write("#### 🔽 Least 3 Models by Quantity")
+                        
+                        # Configure AgGrid
+                        gb_bottom_qty = GridOptionsBuilder.from_dataframe(
+                            bottom_qty.reset_index().rename(columns={'qty': 'Total Quantity'})
+                        )
+                        gb_bottom_qty.configure_column("Model", headerName="Model", width=150)
+                        gb_bottom_qty.configure_column("Total Quantity", 
+                                                    headerName="Total Quantity", 
+                                                    type=["numericColumn", "numberColumnFilter"],
+                                                    width=120)
+                        gb_bottom_qty.configure_default_column(
+                            resizable=True,
+                            filterable=True,
+                            sortable=True,
+                            editable=False
+                        )
+                        grid_options_bottom_qty = gb_bottom_qty.build()
+                        
+                        AgGrid(
+                            bottom_qty.reset_index().rename(columns={'qty': 'Total Quantity'}),
+                            gridOptions=grid_options_bottom_qty,
+                            height=120,
+                            theme='streamlit',
+                            fit_columns_on_grid_load=True
+                        )
+                        
+                        # Least 3 Models by Revenue
+                        bottom_amount = analysis['bottom_amount']
+                        st.write("#### 🔽 Least 3 Models by Revenue")
+                        
+                        # Configure AgGrid
+                        gb_bottom_amount = GridOptionsBuilder.from_dataframe(
+                            bottom_amount.reset_index().rename(columns={'amount': 'Total Revenue ($)'})
+                        )
+                        gb_bottom_amount.configure_column("Model", headerName="Model", width=150)
+                        gb_bottom_amount.configure_column("Total Revenue ($)",
+                                                        headerName="Total Revenue ($)",
+                                                        type=["numericColumn", "numberColumnFilter"],
+                                                        width=150,
+                                                        valueFormatter="value.toLocaleString('en-US', {style: 'currency', currency: 'USD', minimumFractionDigits: 2})")
+                        gb_bottom_amount.configure_default_column(
+                            resizable=True,
+                            filterable=True,
+                            sortable=True,
+                            editable=False
+                        )
+                        grid_options_bottom_amount = gb_bottom_amount.build()
+                        
+                        AgGrid(
+                            bottom_amount.reset_index().rename(columns={'amount': 'Total Revenue ($)'}),
+                            gridOptions=grid_options_bottom_amount,
+                            height=120,
+                            theme='streamlit',
+                            fit_columns_on_grid_load=True
+                        )
+
+                with tab2:
+                    st.subheader("📈 Revenue & Quantity Trends")
+                    st.divider()
+                        
+                    # Calculate daily trends
+                    revenue_trend = analysis['revenue_trend']
+                    qty_trend = analysis['qty_trend']
+                        
+                    # Create metric columns for trends
+                    col_trend1, col_trend2 = st.columns(2)
+
+                    with col_trend1:
+                        st.metric("Peak Revenue of the Day", 
+                                f"${revenue_trend.max():,.2f}", 
+                                revenue_trend.idxmax().strftime('%Y-%m-%d'))
+                    with col_trend2:
+                        st.metric("Peak Quantity of the Day", 
+                                f"{qty_trend.max():,}", 
+                                qty_trend.idxmax().strftime('%Y-%m-%d'))
+                    st.divider()
+
+                    # Service code analysis
+                    col_service1, col_service2 = st.columns(2)
+                    with col_service1:
+                        st.write("#### �️ Most Frequent ServiceCode")
+                        freq_service = analysis['freq_service']
+                        st.dataframe(freq_service.reset_index().rename(
+                            columns={'servicecode': 'ServiceCode', 'row_count': 'Count'}))
+
+                    with col_service2:
+                        st.write("#### 💰 Highest Revenue ServiceCodes")
+                        revenue_service = analysis['revenue_service']
+                        st.dataframe(revenue_service.reset_index().rename(
+                            columns={'amount': 'Total Revenue ($)'}))
+
+                     # Average rate analysis
+                    avg_rate = analysis['model_avg_rate']
+                    st.write("#### 🧮 Average Rate per Model")
+                    st.dataframe(avg_rate.reset_index().rename(columns={'rate': 'Average Rate ($)'}))
+                    st.divider()
+
+                    st.subheader("Plot Trend")
+                    # Plot trends
+                    with perf.span('figure'):
+                        fig, ax = plt.subplots(figsize=(12, 5))
+                        revenue_trend.plot(ax=ax, label="Revenue ($)", color='green')
+                        qty_trend.plot(ax=ax, label="Quantity", color='blue')
+                        ax.legend()
+                        ax.set_title("📆 Daily Revenue & Quantity Trend")
+                        ax.set_ylabel("Amount ($) / Quantity")
+                        st.pyplot(fig)
+
+                with tab3:
+                    st.subheader("📅 Model Analysis")
+                    st.divider()
+                    
+                    # Time-based model occurrence
+                    # Weekly counts
+                    # Top 10 by count
+                    top10_weekly_model = analysis['top10_weekly_model']
+                    # Display with AgGrid
+                    st.write("#### 📆 Weekly Occurrences (Top 10)")
+                    # Set AgGrid options
+                    gb = GridOptionsBuilder.from_dataframe(top10_weekly_model)
+                    gb.configure_default_column(cellStyle={'textAlign': 'center'})
+                    gb.configure_grid_options(domLayout='autoHeight')
+                    gridOptions = gb.build()
+                    AgGrid(top10_weekly_model, gridOptions=gridOptions, height=400, fit_columns_on_grid_load=True)
+                
+                    # Top 10 by count of Year, Month, and Model
+                    top10_monthly_model = analysis['top10_monthly_model']
+                    # Display header
+                    st.write("#### 📆 Monthly Occurrences (Top 10)")
+                    # Build grid options
+                    gb = GridOptionsBuilder.from_dataframe(top10_monthly_model)
+                    # Center align both cells and headers
+                    gb.configure_default_column(
+                        cellStyle={'textAlign': 'center'},
+                        headerStyle={'textAlign': 'left'}
+                    )
+                    # Other grid settings
+                    gb.configure_grid_options(domLayout='autoHeight')
+                    gridOptions = gb.build()
+
+                    # Display the AgGrid
+                    AgGrid(top10_monthly_model, gridOptions=gridOptions, height=400, fit_columns_on_grid_load=True)
+                    #---------------------------------------------------------------------
+                    quarterly_model = analysis['quarterly_model']
+                    st.write("#### 📆 Quarterly Occurrences (Top 10)")
+
+                    gb = GridOptionsBuilder.from_dataframe( quarterly_model)
+                    gb.configure_default_column(cellStyle={'textAlign': 'center'})
+                    gb.configure_grid_options(domLayout='normal')
+                    gridOptions = gb.build()
+                    AgGrid( quarterly_model, gridOptions=gridOptions, height=400, fit_columns_on_grid_load=True)
+                    
+                    # Revenue share pie chart
+                    st.write("#### 📊 Revenue Share by Top 10 Models")
+                    revenue_share = analysis['revenue_share']
+                    
+                    col_pie1, col_pie2 = st.columns([1, 2])
+                    
+                    with col_pie1:
+                        st.dataframe(
+                        revenue_share.reset_index()
+                        .rename(columns={'amount': 'Total Revenue ($)'})
+                        .style
+                        .format({'Total Revenue ($)': '${:,.2f}'})  # Format to 2 decimal places
+                        .set_properties(**{'text-align': 'center'}),
+                        use_container_width=True
+                    )
+
+                    with col_pie2:
+                        with perf.span('figure'):
+                            fig2, ax2 = plt.subplots()
+                            ax2.pie(revenue_share, labels=revenue_share.index, autopct='%1.1f%%', startangle=140)
+                            ax2.axis('equal')
+                            st.pyplot(fig2)
@@ -0,0 +1,44 @@
+"""Home page: feature overview and a live simulation graph."""
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+import perf
+
+
+def render(app):
+    st.markdown(
+        '<p style="font-family:sans-serif;text-align:center; color:#42b6f5; font-size: 25px;">✨ANALYSIS ON ROKU DATA✨</p>',
+        unsafe_allow_html=True
+    )
+    #st.divider()
+    #st.subheader("Analysis on Roku Data")
+    pan1, pan2 = st.columns(2)
+    with pan1:
+        st.write("")
+        st.write("")
+        st.write("✔️...Roku Monthly Revenue Histogram as week wise")
+        st.write("✔️...Roku Weekly comparision with Quantity and Amount")
+        st.write("✔️...Roku Servicecode wise weekly Data view")
+        st.write("✔️...A Statistical view of Roku 2025 Data ")
+        st.write("✔️...An Analysis on Roku 2025 Dataset")
+        
+    with pan2:
+        def simulation_graph(data):
+            fig = go.Figure(data=[go.Scatter(x=data['time'], y=data['value'])])
+            fig.update_layout(
+                xaxis_title="Time",
+                yaxis_title="Value",
+                width=400,
+                height=300
+            )
+            return fig
+
+        def graph():
+            time_steps = np.arange(0, 20, 0.1)
+            values = [np.random.normal(loc=5, scale=1.5) for _ in time_steps]
+            simulation_data = {'time': time_steps, 'value': values}
+            st.plotly_chart(simulation_graph(simulation_data), use_container_width=False)
+        
+        with perf.span('figure'):
+            graph()
@@ -0,0 +1,120 @@
+"""Monthly Revenue page: week-wise revenue graph for one month."""
+from datetime import datetime
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+import analytics
+import perf
+
+
+def render(app):
+    #st.markdown(
+    #   '<p style="font-family:sans-serif;text-align:center; color:#83e6e6; font-size: 25px;">WEEK WISE  MONTHLY REVENUE GRAPH</p>',
+    #    unsafe_allow_html=True
+    #)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        year = st.number_input("📅 Year", min_value=2000, max_value=2100, value=datetime.now().year)
+    with col2:
+        month = st.selectbox("Month", list(range(1, 13)), format_func=lambda x: datetime(2000, x, 1).strftime('%B'))
+    with col3:
+        invoice_code = st.text_input("🔑 Invoice Code", value="ROKU")
+
+    def compute_weekly_data(year, month):
+        return analytics.monthly_weekly_revenue(app.fetch_summary(*analytics.month_bounds(year, month)))
+
+    with st.spinner("Loading data..."):
+        weekly_data = app.aggregate('alfa', (year, month), lambda: compute_weekly_data(year, month))
+    
+    if not weekly_data.empty:
+        st.markdown(
+            f"<h4 style='text-align: center; font-family: Arial, sans-serif; font-weight: bold; color:#e32bda;'>📅 {datetime(2000, month, 1).strftime('%B')} {year} - Metrics</h4>",
+            unsafe_allow_html=True
+        )
+        
+        with perf.span('figure'):
+            # Create electric wave visualization
+            fig = go.Figure()
+        
+            # Generate smooth wave-like data points
+            x = weekly_data['week_number']
+            y = weekly_data['total_amount']
+        
+            # Create a smooth curve through the points
+            x_smooth = np.linspace(x.min(), x.max(), 300)
+            y_smooth = np.interp(x_smooth, x, y)
+        
+            # Add electric wave trace
+            fig.add_trace(go.Scatter(
+                x=x_smooth,
+                y=y_smooth,
+                mode='lines',
+                name='Revenue Wave',
+                line=dict(
+                    color='#00f2ff',
+                    width=4,
+                    shape='spline',
+                    smoothing=1.3
+                ),
+                fill='tozeroy',
+                fillcolor='rgba(0, 242, 255, 0.2)'
+            ))
+        
+            # Add spark points at each week
+            fig.add_trace(go.Scatter(
+                x=x,
+                y=y,
+                mode='markers+text',
+                name='Week Peaks',
+                marker=dict(
+                    color='#ff00e4',
+                    size=12,
+                    line=dict(width=2, color='white')
+                ),
+                text=[f"Week {int(w)}" for w in weekly_data['week_number']],
+                textposition='top center',
+                textfont=dict(
+                    family="Arial",
+                    size=12,
+                    color="white"
+                )
+            ))
+        
+            # Customize layout
+            fig.update_layout(
+                title='⚡ Monthly Revenue Graph ⚡',
+                xaxis_title='Week Number',
+                yaxis_title='Amount ($)',
+                template='plotly_dark',
+                plot_bgcolor='rgba(0, 0, 20, 0.9)',
+                paper_bgcolor='rgba(0, 0, 20, 0.7)',
+                font=dict(family='Arial, sans-serif', size=12, color='white'),
+                legend=dict(x=0.02, y=0.98),
+                height=500,
+                hovermode='x unified',
+                xaxis=dict(
+                    showgrid=True,
+                    gridcolor='rgba(100, 100, 100, 0.2)',
+                    tickvals=x,
+                    ticktext=[f"Week {int(w)}" for w in x]
+                ),
+                yaxis=dict(
+                    showgrid=True,
+                    gridcolor='rgba(100, 100, 100, 0.2)'
+                )
+            )
+        
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Display week details
+        st.subheader("Weekly Details")
+        for _, row in weekly_data.iterrows():
+            st.write(f"Week {int(row['week_number'])}: {row['week_start'].strftime('%m/%d/%Y')} to {row['week_end'].strftime('%m/%d/%Y')}")
+            st.write(f"  - Amount: ${row['total_amount']:,.2f}")
+            st.write(f"  - Quantity: {row['total_quantity']:,}")
+            st.write("---")
+    else:
+        st.warning("⚠️ No data found for the selected filters.")
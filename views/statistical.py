@@ -0,0 +1,192 @@
+"""Statistical page: period totals per servicecode and the raw dataset grid."""
+import os
+import tempfile
+import uuid
+
+import plotly.express as px
+import streamlit as st
+from st_aggrid import GridOptionsBuilder, AgGrid
+
+import analytics
+import export
+import perf
+from database import DETAIL_COLUMNS
+
+# Row counts offered by the server-side grid
+GRID_PAGE_SIZES = [50, 100, 250, 500]
+# With server.enableStaticServing, Streamlit streams <app dir>/static/ from disk at app/static/
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'exports')
+
+# Grid time includes serialising the frame for the browser
+AgGrid = perf.timed('grid')(AgGrid)
+
+
+def render(app):
+    def fetch_statistical_data():
+        return app.fetch_data(DETAIL_COLUMNS)
+
+    with st.spinner("Loading data..."): 
+        summary = app.fetch_summary()
+    
+    st.markdown(
+        '<p style="font-family:sans-serif;text-align:center; color:#e32bda; font-size: 25px;">📊✨ ROKU DATA SET - 2025 ✨📊</p>',
+        unsafe_allow_html=True
+    )
+    #st.header("Roku Statistics")
+    #st.divider()
+    
+    if not summary.empty:
+        col1,col2 = st.columns(2)
+        with col1:
+            time_period = st.selectbox("Select Time Period", ["Weekly", "Monthly", "Quarterly", "Half-Yearly"])
+            period_column = analytics.PERIOD_COLUMNS[time_period]
+            grouped_data = app.aggregate('delta', (period_column,), lambda: analytics.period_totals(summary, period_column))
+            
+            grid_options = GridOptionsBuilder.from_dataframe(grouped_data)
+            grid_options.configure_default_column(
+                enablePivot=True, enableValue=True, enableRowGroup=True, sortable=True, filterable=True)
+            grid_options.configure_pagination(paginationAutoPageSize=True)
+            AgGrid(grouped_data, gridOptions=grid_options.build())
+        with col2:
+            Graph = st.selectbox("Select Histogram",["Pie_Chart", "Line_Chart", "Bar_Chart", "Scatter_Chart"])
+            with perf.span('figure'):
+                if Graph == "Pie_Chart":
+                    st.plotly_chart(px.pie(grouped_data, values='amount', names='servicecode', 
+                                       title='Proportion of Amount by Servicecode-2025',
+                                       hover_data=['amount'], 
+                                       labels={'amount': 'Amount ($)'}), 
+                                 use_container_width=True)
+                elif Graph == 'Line_Chart':
+                    st.plotly_chart(px.line(grouped_data, x=grouped_data.columns[0], y='amount', 
+                                         color='servicecode', markers=True,
+                                         labels={'amount': 'Amount ($)'}),
+                                 use_container_width=True)
+                elif Graph == 'Bar_Chart':
+                    st.plotly_chart(px.bar(grouped_data, y=grouped_data.columns[0], x='amount', 
+                                       color='servicecode', barmode='group', orientation='h',
+                                       labels={'amount': 'Amount ($)'}),
+                                 use_container_width=True)
+                elif Graph == 'Scatter_Chart':
+                    st.plotly_chart(px.scatter(grouped_data, x=grouped_data.columns[0], y='amount', 
+                                            color='servicecode',
+                                            labels={'amount': 'Amount ($)'}),
+                                 use_container_width=True)
+
+        #st.divider()
+        st.markdown("####  Roku Data Set - 2025")
+        grid_mode = st.radio("Grid", ["Server-side paging", "Full table"], horizontal=True,
+                             help="Server-side paging sends only the current page of rows to the browser")
+        if grid_mode == "Full table":
+            # Add all time period columns on a shallow copy: the cached frame is shared across
+            # sessions and may be mapped read-only from the snapshot, and its rows needn't be duplicated
+            df = analytics.add_period_columns(fetch_statistical_data().copy(deep=False))
+            st.write("Right-click on the data to download data set as CSV / Excel")
+            grid_options = GridOptionsBuilder.from_dataframe(df)
+            grid_options.configure_default_column(
+                enablePivot=True, enableValue=True, enableRowGroup=True, sortable=True, filterable=True)
+            grid_options.configure_pagination(paginationAutoPageSize=True)
+            AgGrid(df, gridOptions=grid_options.build())
+        else:
+            render_server_grid(app, summary)
+        st.divider()
+
+
+def render_server_grid(app, summary):
+    """Raw rows one page at a time; filters, sort and paging are applied in SQLite"""
+    def reset_page():
+        st.session_state.delta_page = 1
+
+    filter_cols = st.columns([2, 2, 2, 2])
+    with filter_cols[0]:
+        dates = st.date_input("Report dates", value=(summary['reportdate'].min(), summary['reportdate'].max()),
+                              key='delta_dates', on_change=reset_page)
+    with filter_cols[1]:
+        servicecodes = st.multiselect("Servicecode", sorted(summary['servicecode'].astype(str).unique()),
+                                      key='delta_servicecodes', on_change=reset_page)
+    with filter_cols[2]:
+        models = st.multiselect("Model", sorted(summary['Model'].astype(str).unique()),
+                                key='delta_models', on_change=reset_page)
+    with filter_cols[3]:
+        search = st.text_input("🔍 Designator / TrackingID / invoice", key='delta_search', on_change=reset_page)
+
+    sort_cols = st.columns([2, 1, 1, 1])
+    with sort_cols[0]:
+        sort_by = st.selectbox("Sort by", DETAIL_COLUMNS, index=DETAIL_COLUMNS.index('reportdate'),
+                               key='delta_sort_by', on_change=reset_page)
+    with sort_cols[1]:
+        descending = st.toggle("Descending", value=True, key='delta_descending', on_change=reset_page)
+    with sort_cols[2]:
+        page_size = st.selectbox("Rows per page", GRID_PAGE_SIZES, index=1, key='delta_page_size',
+                                 on_change=reset_page)
+
+    # The date input returns a single date while a range is still being picked
+    from_date, to_date = (dates[0], dates[-1]) if dates else (None, None)
+    query = dict(from_date=from_date, to_date=to_date, servicecodes=servicecodes, models=models,
+                 search=search.strip() or None, sort_by=sort_by, descending=descending)
+
+    page = st.session_state.get('delta_page', 1)
+    rows, total = app.fetch_data_page(DETAIL_COLUMNS, limit=page_size, offset=(page - 1) * page_size, **query)
+    page_count = max(1, -(-total // page_size))
+    if page > page_count:
+        # Filters changed under a stored page; fetch the last page that exists
+        st.session_state.delta_page = page = page_count
+        rows, total = app.fetch_data_page(DETAIL_COLUMNS, limit=page_size, offset=(page - 1) * page_size, **query)
+    with sort_cols[3]:
+        st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count, key='delta_page')
+
+    st.caption(f"Rows {(page - 1) * page_size + min(1, len(rows)):,}–{(page - 1) * page_size + len(rows):,} "
+               f"of {total:,}")
+    if not rows.empty:
+        rows = analytics.add_period_columns(rows)
+    grid_options = GridOptionsBuilder.from_dataframe(rows)
+    # Sorting and filtering are server-side; client-side versions would only see this page
+    grid_options.configure_default_column(resizable=True, sortable=False, filterable=False)
+    AgGrid(rows, gridOptions=grid_options.build(), height=420)
+
+    render_export(app, query, total)
+
+
+def render_export(app, query, total):
+    """Stream the filtered rows from SQLite to a file and offer it for download"""
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        label = st.selectbox("Export format", list(export.EXPORT_FORMATS), key='delta_export_format')
+    fmt = export.EXPORT_FORMATS[label]
+    with col2:
+        st.write("")
+        prepare = st.button(f"⬇️ Export {total:,} filtered rows as {label}", disabled=total == 0)
+
+    # Served from disk by Streamlit's static file handler when it is enabled (config.toml);
+    # otherwise download_button has to copy the finished file into server memory
+    static = st.get_option('server.enableStaticServing')
+    directory = EXPORT_DIR if static else os.path.join(tempfile.gettempdir(), 'roku_exports')
+    if prepare:
+        os.makedirs(directory, exist_ok=True)
+        export.remove_stale_exports(directory)
+        name = f"roku_export_{uuid.uuid4().hex}.{fmt}"
+        path = os.path.join(directory, name)
+        with st.spinner(f"Exporting {total:,} rows..."):
+            try:
+                rows = export.export_rows(app.data_loader.db_manager, path, fmt, **query)
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+            else:
+                if static:
+                    st.session_state.delta_export = {'name': name, 'fmt': fmt, 'rows': rows}
+                else:
+                    # Handed over on this run only: a button rendered on every rerun
+                    # would copy the whole file into the media store each time
+                    try:
+                        with open(path, 'rb') as f:
+                            st.download_button(f"📥 Download {rows:,} rows", f, file_name=f"roku_data.{fmt}",
+                                               mime=export.MIME_TYPES[fmt], on_click='ignore')
+                    finally:
+                        os.remove(path)
+                    st.caption("The download is available until the page next changes. "
+                               "Set server.enableStaticServing to serve exports from disk.")
+
+    ready = st.session_state.get('delta_export')
+    if static and ready and os.path.exists(os.path.join(directory, ready['name'])):
+        filename = f"roku_data.{ready['fmt']}"
+        st.markdown(f"<a href='app/static/exports/{ready['name']}' download='{filename}'>"
+                    f"📥 Download {ready['rows']:,} rows ({filename})</a>", unsafe_allow_html=True)
@@ -0,0 +1,256 @@
+"""Weekly Revenue page: week-over-week quantity and amount comparison."""
+import time
+from datetime import datetime
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import analytics
+import perf
+
+
+def render(app):
+    #st.markdown(
+    #    "<h3 style='text-align: center; font-family: Arial, sans-serif; font-weight: bold; color:#0cb3f0;'>📊Roku Week-Wise Data</h3>",
+    #    unsafe_allow_html=True
+    #)
+
+    def compute_weekly_data(year, month):
+        return analytics.weekly_revenue_comparison(app.fetch_summary(*analytics.month_bounds(year, month)))
+
+    def fetch_weekly_data(year, month):
+        return app.aggregate('beta', (year, month), lambda: compute_weekly_data(year, month))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        year = st.number_input("📅 Year", min_value=2000, max_value=2100, value=datetime.now().year)
+    with col2:
+        month = st.selectbox("Month", list(range(1, 13)), format_func=lambda x: datetime(2000, x, 1).strftime('%B'))
+    with col3:
+        invoice_code = st.text_input("🔑 Invoice Code", value="ROKU")
+    layout = st.radio("Layout", ["Combined", "Per week"], horizontal=True,
+                      help="Combined draws every week in one card grid and one chart")
+    st.divider()
+    
+    with st.spinner("Loading data..."):
+        weekly_data = fetch_weekly_data(year, month)
+    
+    if not weekly_data.empty:
+        st.markdown(
+            f"<h4 style='text-align: center; font-family: Arial, sans-serif; font-weight: bold; color: #e32bda;'>📅 {datetime(2000, month, 1).strftime('%B')} {year} - Weekly Metrics</h4>",
+            unsafe_allow_html=True
+        )
+        
+        card_style = """
+            <style>
+                .metric-card {
+                    background: linear-gradient(135deg, #ffffb3 0%, #e4e8f0 100%);
+                    border-radius: 12px;
+                    padding: 20px;
+                    margin: 12px;
+                    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+                    text-align: center;
+                    font-family: Arial, sans-serif;
+                    border-left: 5px solid #0cb3f0;
+                }
+                .metric-header {
+                    font-size: 16px;
+                    font-weight: bold;
+                    color: #2c3e50;
+                    margin-bottom: 10px;
+                }
+                .metric-value {
+                    font-size: 14px;
+                    font-weight: bold;
+                    color: #2c3e50;
+                    margin: 5px 0;
+                }
+                .metric-date {
+                    font-size: 12px;
+                    font-weight:bold;
+                    color: #060e24;
+                    margin-top: 10px;
+                }
+                .positive-change {
+                    color: #27ae60;
+                    font-size: 12px;
+                    font-weight: bold;
+                    background-color: rgba(39, 174, 96, 0.1);
+                    padding: 3px 6px;
+                    border-radius: 4px;
+                }
+                .week-grid {
+                    display: grid;
+                    grid-template-columns: repeat(auto-fill, minmax(220px, 1fr));
+                }
+                .negative-change {
+                    color: #e74c3c;
+                    font-size: 12px;
+                    font-weight: bold;
+                    background-color: rgba(231, 76, 60, 0.1);
+                    padding: 3px 6px;
+                    border-radius: 4px;
+                }
+            </style>
+        """
+        st.markdown(card_style, unsafe_allow_html=True)
+        
+        if layout == "Combined":
+            def compute_deltas(year, month):
+                prev_year, prev_month = (year, month - 1) if month > 1 else (year - 1, 12)
+                return analytics.week_over_week(weekly_data, fetch_weekly_data(prev_year, prev_month))
+
+            weeks = app.aggregate('beta_deltas', (year, month), lambda: compute_deltas(year, month))
+            render_combined(weeks)
+        else:
+            for index, row in weekly_data.iterrows():
+                week_number = str(int(row['week_number']))
+                start_date = row['week_start'].strftime('%m/%d/%Y')
+                end_date = row['week_end'].strftime('%m/%d/%Y')
+                total_qty = f"{int(row['total_quantity']):,}"
+                total_amount = f"${float(row['total_amount']):,.2f}"
+            
+                # Safely get previous week data
+                prev_row = None
+                if index > 0:
+                    prev_row = weekly_data.iloc[index - 1]
+                elif row['week_number'] > 1:
+                    # Try to get data from previous month if available
+                    prev_month = month - 1 if month > 1 else 12
+                    prev_year = year if month > 1 else year - 1
+                    prev_data = fetch_weekly_data(prev_year, prev_month)
+                    if not prev_data.empty:
+                        prev_row = prev_data[prev_data['week_number'] == row['week_number'] - 1]
+                        if not prev_row.empty:
+                            prev_row = prev_row.iloc[0]
+            
+                col1, col2 = st.columns([1, 2])
+                with col1:
+                    if prev_row is not None and not pd.isna(row['pct_change']):
+                        change_amount = row['total_amount'] - prev_row['total_amount']
+                        change_text = f"+${abs(change_amount):.2f}" if change_amount >= 0 else f"-${abs(change_amount):.2f}"
+                        change_class = "positive-change" if change_amount >= 0 else "negative-change"
+                    
+                        st.markdown(f"""
+                            <div class="metric-card">
+                                <div class="metric-header">Week {week_number}</div>
+                                <div class="metric-value">📦 Qty: {total_qty}</div>
+                                <div class="metric-value">💰 Amount: {total_amount}</div>
+                                <div class="{change_class}">📈 {change_text} ({abs(row['pct_change'])}%)</div>
+                                <div class="metric-date">📅 {start_date} to {end_date}</div>
+                            </div>
+                        """, unsafe_allow_html=True)
+                    else:
+                        st.markdown(f"""
+                            <div class="metric-card">
+                                <div class="metric-header">Week {week_number}</div>
+                                <div class="metric-value">📦 Qty: {total_qty}</div>
+                                <div class="metric-value">💰 Amount: {total_amount}</div>
+                                <div class="metric-date">📅 {start_date} to {end_date}</div>
+                            </div>
+                        """, unsafe_allow_html=True)
+            
+                with col2:
+                    if prev_row is not None and not pd.isna(row['pct_change']):
+                        # Create comparison visualization
+                        with perf.span('figure'):
+                            fig = go.Figure()
+                    
+                            weeks = [f"Week {int(row['week_number']) - 1}", f"Week {int(row['week_number'])}"]
+                            amounts = [prev_row['total_amount'], row['total_amount']]
+                    
+                            fig.add_trace(go.Bar(
+                                x=weeks,
+                                y=amounts,
+                                marker_color=['#3498db', '#2ecc71'],
+                                text=[f"${x:,.2f}" for x in amounts],
+                                textposition='auto'
+                            ))
+                    
+                            # Add trend line
+                            fig.add_trace(go.Scatter(
+                                x=weeks,
+                                y=amounts,
+                                mode='lines+markers',
+                                line=dict(color='#db39db', width=2),
+                                marker=dict(size=10),
+                                showlegend=False
+                            ))
+                    
+                            fig.update_layout(
+                                title=f"Week-over-Week Comparison",
+                                xaxis_title='',
+                                yaxis_title='Amount ($)',
+                                template='plotly_white',
+                                height=300,
+                                margin=dict(l=20, r=20, t=60, b=20)
+                            )
+                    
+                            st.plotly_chart(fig, use_container_width=True)
+                    else:
+                        if row['week_number'] == 1:
+                            st.info("🌟 First week of the year - no comparison available")
+                        else:
+                            #st.info("⚠️ Previous week data not available for comparison")
+                            st.write(" ")
+            
+                st.markdown("<hr style='border-top: 1px dashed #ddd; margin: 20px 0;'>", unsafe_allow_html=True)
+                time.sleep(0.3)
+    else:
+        st.warning("⚠️ No data found for the selected filters.")
+
+
+def render_combined(weeks):
+    """Every week as one card grid and one chart, so page cost does not grow with the week count"""
+    cards = []
+    for row in weeks.itertuples(index=False):
+        change = ''
+        if not pd.isna(row.change_amount):
+            change_class = "positive-change" if row.change_amount >= 0 else "negative-change"
+            sign = '+' if row.change_amount >= 0 else '-'
+            percent = '' if pd.isna(row.pct_change) else f' ({abs(row.pct_change)}%)'
+            change = f'<div class="{change_class}">📈 {sign}${abs(row.change_amount):,.2f}{percent}</div>'
+        # Unindented: Markdown would treat indented HTML inside the grid as a code block
+        cards.append(
+            '<div class="metric-card">'
+            f'<div class="metric-header">Week {int(row.week_number)}</div>'
+            f'<div class="metric-value">📦 Qty: {int(row.total_quantity):,}</div>'
+            f'<div class="metric-value">💰 Amount: ${float(row.total_amount):,.2f}</div>'
+            f'{change}'
+            f'<div class="metric-date">📅 {row.week_start:%m/%d/%Y} to {row.week_end:%m/%d/%Y}</div>'
+            '</div>'
+        )
+    st.markdown(f'<div class="week-grid">{"".join(cards)}</div>', unsafe_allow_html=True)
+
+    labels = [f"Week {int(number)}" for number in weeks['week_number']]
+    colors = weeks['change_amount'].map(lambda value: '#3498db' if pd.isna(value) else '#2ecc71' if value >= 0 else '#e74c3c')
+    change_text = weeks['pct_change'].map(lambda value: '' if pd.isna(value) else f" ({value:+.1f}%)")
+
+    with perf.span('figure'):
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=weeks['total_amount'],
+            marker_color=list(colors),
+            text=[f"${amount:,.2f}{text}" for amount, text in zip(weeks['total_amount'], change_text)],
+            textposition='auto',
+            name='Amount'
+        ))
+        fig.add_trace(go.Scatter(
+            x=labels,
+            y=weeks['total_amount'],
+            mode='lines+markers',
+            line=dict(color='#db39db', width=2),
+            marker=dict(size=10),
+            showlegend=False
+        ))
+        fig.update_layout(
+            title="Week-over-Week Comparison",
+            xaxis_title='',
+            yaxis_title='Amount ($)',
+            template='plotly_white',
+            height=400,
+            margin=dict(l=20, r=20, t=60, b=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,100 @@
+"""Weekly Services page: servicecode totals per Sunday-to-Saturday week."""
+from datetime import datetime
+
+import streamlit as st
+from st_aggrid import AgGrid
+
+import analytics
+import perf
+from database import DETAIL_COLUMNS
+
+# Card grid page sizes; multiples of the three grid columns
+PAGE_SIZES = [9, 18, 36, 72]
+
+# Recorded as this page's 'grid' stage
+AgGrid = perf.timed('grid')(AgGrid)
+
+
+def render(app):
+    def fetch_data(from_date, to_date):
+        return app.fetch_summary(from_date, to_date)
+
+    #new_title = '<p style="font-family:sans-serif;text-align:center; color:#5142f5; font-size: 25px;">🎯 Invoiced Week-wise Servicecode Data 🎯</p>'
+    #st.markdown(new_title, unsafe_allow_html=True)
+    #st.markdown("#### Select Invoice Week")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("#### Provide Invoicing Week ➡️")
+    with col2:
+        from_date = st.date_input("From Date", value=datetime(2025, 1, 1))
+    with col3:
+        to_date = st.date_input("To Date", value=datetime.today())
+
+    with st.spinner("Loading data..."):
+        df = fetch_data(from_date, to_date)
+    
+    if "selected_service" not in st.session_state:
+        st.session_state.selected_service = None
+
+    def reset_page():
+        st.session_state.charlie_page = 1
+    
+    if not df.empty:
+        weekly_metrics = app.aggregate('charlie', (from_date, to_date), lambda: analytics.service_weekly_metrics(df))
+        
+        if st.session_state.selected_service is None:
+            new_title = '<p style="font-family:sans-serif;text-align:center; color:#e32bda; font-size:25px;">SERVICECODEs DATA</p>'
+            st.markdown(new_title, unsafe_allow_html=True)
+            #st.markdown("##### Metrics of the week")
+            # Only the visible page of cards is built, so widget count is bounded by the page size
+            filter_col, size_col, page_col = st.columns([2, 1, 1])
+            with filter_col:
+                search = st.text_input("🔍 Filter service codes", key='charlie_search', on_change=reset_page)
+            with size_col:
+                page_size = st.selectbox("Cards per page", PAGE_SIZES, index=1, key='charlie_page_size',
+                                         on_change=reset_page)
+
+            visible = weekly_metrics
+            if search.strip():
+                visible = visible[visible['servicecode'].astype(str).str.contains(search.strip(), case=False, regex=False)]
+            page_count = max(1, -(-len(visible) // page_size))
+            # A narrower date range can leave the stored page past the end
+            if st.session_state.get('charlie_page', 1) > page_count:
+                st.session_state.charlie_page = page_count
+            with page_col:
+                page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key='charlie_page')
+            st.caption(f"{len(visible):,} of {len(weekly_metrics):,} service-code weeks")
+
+            cols = st.columns(3)
+            page_rows = visible.iloc[(page - 1) * page_size:page * page_size]
+            for idx, row in enumerate(page_rows.itertuples(index=False)):
+                with cols[idx % 3]:
+                    card = st.container()
+                    card.markdown(
+                    f"""
+                    <div style='border:2px solid #4CAF50; box-shadow: 2px 2px 10px rgba(0, 0, 0, 0.1); padding:10px; border-radius:10px; text-align:center;'>
+                        <h4 style='color:#20b6c7;'>{row.servicecode}</h4>
+                        <p style='color:#60eb8a ;'>Qty: {int(row.qty)}</p>
+                        <p style='color:#eef7da;'>Amount: ${float(row.amount):,.2f}</p>
+                        <button onclick="window.location.href='?selected_service={row.servicecode}'">👇</button>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                    )
+
+                    # Keyed by content rather than position so keys stay stable across pages
+                    if st.button(f"View {row.servicecode} Data", key=f"view_{row.servicecode}_{row.WeekStart:%Y%m%d}"):
+                        st.session_state.selected_service = row.servicecode
+                        st.rerun()
+        else:
+            selected_service = st.session_state.selected_service
+            # Raw rows only for the selected service, straight from the indexed range query
+            selected_data = app.fetch_data_range(from_date, to_date, selected_service, DETAIL_COLUMNS)
+            st.subheader(f"{selected_service} Data")
+            AgGrid(selected_data)
+            if st.button("Back"):
+                st.session_state.selected_service = None
+                st.rerun()
+    else:
+        st.warning("No data found for the selected date range.")